@@ -0,0 +1,48 @@
+from functools import lru_cache
+
+from django.core.cache import cache
+
+from management.utils import normalize_phone_number
+
+LOGIN_PHONE_CACHE_PREFIX = 'login_phone:'
+LOGIN_PHONE_CACHE_TTL = 5 * 60  # seconds
+LOGIN_PHONE_MISSING_TTL = 30  # seconds
+LOGIN_PHONE_MISSING = 0
+
+# Phone numbers reach these helpers already normalized to ASCII digits and
+# "+", so an ASCII deletion table is enough to keep only the digits.
+_NON_DIGIT_TRANSLATION = str.maketrans(
+    '', '', ''.join(chr(code) for code in range(128) if not chr(code).isdigit())
+)
+
+
+def phone_digits(normalized_phone: str) -> str:
+    return (normalized_phone or '').translate(_NON_DIGIT_TRANSLATION)
+
+
+@lru_cache(maxsize=4096)
+def candidate_phone_values(normalized_phone: str):
+    digits = phone_digits(normalized_phone)
+    candidates = {normalized_phone}
+    if len(digits) >= 10:
+        last_ten = digits[-10:]
+        candidates.add(last_ten)
+        candidates.add('0' + last_ten)
+        candidates.add('+98' + last_ten)
+    return tuple(value for value in candidates if value)
+
+
+def login_phone_cache_key(normalized_phone: str) -> str:
+    return f'{LOGIN_PHONE_CACHE_PREFIX}{normalized_phone}'
+
+
+def invalidate_login_phone_cache(raw_phone):
+    """Drop cached phone lookups for every variant of the given number."""
+
+    normalized = normalize_phone_number(raw_phone)
+    if not normalized:
+        return
+    keys = {login_phone_cache_key(normalized)}
+    for candidate in candidate_phone_values(normalized):
+        keys.add(login_phone_cache_key(normalize_phone_number(candidate)))
+    cache.delete_many(list(keys))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from accounts.models import LoginOTP
+
+
+class Command(BaseCommand):
+    help = (
+        "Mark every expired, still-pending login OTP as used in a single UPDATE. "
+        "Intended to run every minute from a timer instead of on the send path."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default="default",
+            help="Database alias to sweep.",
+        )
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        now = timezone.now()
+
+        expired = LoginOTP.objects.using(using).filter(
+            is_used=False,
+            expires_at__lt=now,
+        ).update(is_used=True)
+
+        if options["verbosity"] > 1 or expired:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Login OTP sweep complete: {expired} expired code(s) retired."
+                )
+            )
@@ -0,0 +1,82 @@
+from django.db import migrations, models
+
+
+def ensure_index(schema_editor, table_name, index_name, columns):
+    """Create the given index only when it is missing on the active backend.
+
+    Columns prefixed with ``-`` are indexed in descending order.
+    """
+
+    connection = schema_editor.connection
+    connection.ensure_connection()
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table_name)
+
+    if index_name in constraints:
+        return
+
+    quote = schema_editor.quote_name
+    column_sql = ", ".join(
+        f"{quote(column[1:])} DESC" if column.startswith("-") else quote(column)
+        for column in columns
+    )
+    schema_editor.execute(
+        f"CREATE INDEX {quote(index_name)} ON {quote(table_name)} ({column_sql})"
+    )
+
+
+def create_loginotp_phone_used_index(apps, schema_editor):
+    table_name = apps.get_model('accounts', 'LoginOTP')._meta.db_table
+    ensure_index(
+        schema_editor,
+        table_name,
+        'accounts_lo_phone_used_idx',
+        ['phone_number', 'is_used', '-created_at'],
+    )
+
+
+def create_loginotp_expires_used_index(apps, schema_editor):
+    table_name = apps.get_model('accounts', 'LoginOTP')._meta.db_table
+    ensure_index(
+        schema_editor,
+        table_name,
+        'accounts_lo_expires_used_idx',
+        ['expires_at', 'is_used'],
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('accounts', '0005_advisoravailability'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(
+                    create_loginotp_phone_used_index,
+                    migrations.RunPython.noop,
+                ),
+                migrations.RunPython(
+                    create_loginotp_expires_used_index,
+                    migrations.RunPython.noop,
+                ),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='loginotp',
+                    index=models.Index(
+                        fields=['phone_number', 'is_used', '-created_at'],
+                        name='accounts_lo_phone_used_idx',
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name='loginotp',
+                    index=models.Index(
+                        fields=['expires_at', 'is_used'],
+                        name='accounts_lo_expires_used_idx',
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,44 @@
+from django.db import migrations, models
+
+
+def add_profile_phone_number_index(apps, schema_editor):
+    """Index profile phone numbers unless a previous deploy already did."""
+
+    Profile = apps.get_model('accounts', 'Profile')
+    table_name = Profile._meta.db_table
+    connection = schema_editor.connection
+
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table_name)
+
+    for constraint in constraints.values():
+        if constraint.get('index') and constraint.get('columns') == ['phone_number']:
+            return
+
+    old_field = Profile._meta.get_field('phone_number')
+    new_field = models.CharField(max_length=15, blank=True, null=True, db_index=True)
+    new_field.set_attributes_from_name('phone_number')
+    new_field.model = Profile
+    schema_editor.alter_field(Profile, old_field, new_field)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_loginotp_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(add_profile_phone_number_index, migrations.RunPython.noop),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='profile',
+                    name='phone_number',
+                    field=models.CharField(blank=True, db_index=True, max_length=15, null=True),
+                ),
+            ],
+        ),
+    ]
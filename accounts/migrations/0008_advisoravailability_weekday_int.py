@@ -0,0 +1,82 @@
+from django.db import migrations, models
+
+
+WEEKDAY_CODES = {
+    'Saturday': 0,
+    'Sunday': 1,
+    'Monday': 2,
+    'Tuesday': 3,
+    'Wednesday': 4,
+    'Thursday': 5,
+    'Friday': 6,
+}
+WEEKDAY_CHOICES = [
+    (0, 'شنبه'),
+    (1, 'یکشنبه'),
+    (2, 'دوشنبه'),
+    (3, 'سه‌شنبه'),
+    (4, 'چهارشنبه'),
+    (5, 'پنج‌شنبه'),
+    (6, 'جمعه'),
+]
+
+
+def codes_to_numbers(apps, schema_editor):
+    AdvisorAvailability = apps.get_model('accounts', 'AdvisorAvailability')
+    for code, number in WEEKDAY_CODES.items():
+        AdvisorAvailability.objects.filter(day_of_week=code).update(weekday=number)
+    unknown = list(
+        AdvisorAvailability.objects.filter(weekday__isnull=True)
+        .values_list('pk', 'day_of_week')
+    )
+    if unknown:
+        raise ValueError(f'Unrecognised AdvisorAvailability.day_of_week values: {unknown}')
+
+
+def numbers_to_codes(apps, schema_editor):
+    AdvisorAvailability = apps.get_model('accounts', 'AdvisorAvailability')
+    for code, number in WEEKDAY_CODES.items():
+        AdvisorAvailability.objects.filter(weekday=number).update(day_of_week=code)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_profile_phone_number_index'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='advisoravailability',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='advisoravailability',
+            name='weekday',
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='advisoravailability',
+            name='day_of_week',
+            field=models.CharField(max_length=10, null=True, verbose_name='روز هفته'),
+        ),
+        migrations.RunPython(codes_to_numbers, numbers_to_codes),
+        migrations.RemoveField(
+            model_name='advisoravailability',
+            name='day_of_week',
+        ),
+        migrations.RenameField(
+            model_name='advisoravailability',
+            old_name='weekday',
+            new_name='day_of_week',
+        ),
+        migrations.AlterField(
+            model_name='advisoravailability',
+            name='day_of_week',
+            field=models.PositiveSmallIntegerField(choices=WEEKDAY_CHOICES, verbose_name='روز هفته'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='advisoravailability',
+            unique_together={('advisor', 'day_of_week', 'start_time')},
+        ),
+    ]
@@ -15,11 +15,20 @@ class Profile(models.Model):
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='student')
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
-    phone_number = models.CharField(max_length=15, blank=True, null=True)
+    phone_number = models.CharField(max_length=15, blank=True, null=True, db_index=True)
     email = models.EmailField(blank=True, null=True)
     profile_picture = models.ImageField(upload_to='profile_pics/', null=True, blank=True, verbose_name="عکس پروفایل")
     telegram_chat_id = models.CharField(max_length=100, blank=True, null=True, verbose_name="شناسه تلگرام")
 
+    class Meta:
+        indexes = [
+            # Notification recipient picker: filtered by role, ordered by name.
+            models.Index(
+                fields=['role', 'first_name', 'last_name'],
+                name='accounts_pr_role_name_idx',
+            ),
+        ]
+
     def get_full_name(self):
         first = self.first_name or ""
         last = self.last_name or ""
@@ -38,6 +47,13 @@ class School(models.Model):
     def __str__(self):
         return self.name 
 
+MAJOR_CODES = {
+    'تجربی': 'T',
+    'ریاضی': 'R',
+    'انسانی': 'E',
+}
+
+
 class Major(models.Model):
     name = models.CharField(max_length=255)
 
@@ -45,26 +61,27 @@ class Major(models.Model):
         return self.name
     @property
     def code(self):
-        mapping = {
-            'تجربی': 'T',
-            'ریاضی': 'R',
-            'انسانی': 'E',
-        }
-        return mapping.get(self.name, '')
+        return MAJOR_CODES.get(self.name, '')
 class Grade(models.Model):
     name = models.CharField(max_length=100)
 
     def __str__(self):
         return self.name
-WEEKDAY_CHOICES = [
-    ('Saturday', 'شنبه'),
-    ('Sunday', 'یکشنبه'),
-    ('Monday', 'دوشنبه'),
-    ('Tuesday', 'سه‌شنبه'),
-    ('Wednesday', 'چهارشنبه'),
-    ('Thursday', 'پنج‌شنبه'),
-    ('Friday', 'جمعه'),
-]
+class Weekday(models.IntegerChoices):
+    SATURDAY = 0, 'شنبه'
+    SUNDAY = 1, 'یکشنبه'
+    MONDAY = 2, 'دوشنبه'
+    TUESDAY = 3, 'سه‌شنبه'
+    WEDNESDAY = 4, 'چهارشنبه'
+    THURSDAY = 5, 'پنج‌شنبه'
+    FRIDAY = 6, 'جمعه'
+
+
+# Courses and the dashboard API still speak in English day codes
+# ('Saturday', ...); availability rows store the Weekday number.
+WEEKDAY_CODES = {day.value: day.name.capitalize() for day in Weekday}
+WEEKDAY_BY_CODE = {code: value for value, code in WEEKDAY_CODES.items()}
+_WEEKDAY_LABELS = dict(Weekday.choices)
 
 
 class Advisor(models.Model):
@@ -81,9 +98,8 @@ class AdvisorAvailability(models.Model):
         related_name='availabilities',
         verbose_name='مشاور',
     )
-    day_of_week = models.CharField(
-        max_length=10,
-        choices=WEEKDAY_CHOICES,
+    day_of_week = models.PositiveSmallIntegerField(
+        choices=Weekday.choices,
         verbose_name='روز هفته',
     )
     start_time = models.TimeField(verbose_name='ساعت شروع')
@@ -94,8 +110,12 @@ class AdvisorAvailability(models.Model):
         unique_together = ('advisor', 'day_of_week', 'start_time')
         ordering = ['advisor_id', 'day_of_week', 'start_time']
 
+    @property
+    def day_code(self):
+        return WEEKDAY_CODES.get(self.day_of_week)
+
     def __str__(self):
-        day_display = dict(WEEKDAY_CHOICES).get(self.day_of_week, self.day_of_week)
+        day_display = _WEEKDAY_LABELS.get(self.day_of_week, self.day_of_week)
         return f"{self.advisor} - {day_display} {self.start_time} تا {self.end_time}"
 
 class Student(models.Model):
@@ -128,18 +148,46 @@ class LoginOTP(models.Model):
                 fields=['expires_at'],
                 name='accounts_lo_expires_3b86f9_idx',
             ),
+            models.Index(
+                fields=['phone_number', 'is_used', '-created_at'],
+                name='accounts_lo_phone_used_idx',
+            ),
+            models.Index(
+                fields=['expires_at', 'is_used'],
+                name='accounts_lo_expires_used_idx',
+            ),
         ]
         ordering = ['-created_at']
 
     def mark_attempt(self):
+        # The F() update keeps the stored counter race-free; mirroring the
+        # increment locally saves the SELECT a refresh_from_db would cost.
         type(self).objects.filter(pk=self.pk).update(attempt_count=F('attempt_count') + 1)
-        self.refresh_from_db(fields=['attempt_count'])
+        self.attempt_count += 1
+        return self.attempt_count
 
     def mark_used(self):
         if not self.is_used:
             self.is_used = True
             self.save(update_fields=['is_used'])
 
+    @classmethod
+    def consume(cls, pk) -> bool:
+        """Atomically mark a pending, unexpired code as used.
+
+        Returns ``False`` when the code was already used, retired or expired,
+        so the same code can never log in twice even across workers.
+        """
+        if pk is None:
+            return False
+        return bool(
+            cls.objects.filter(
+                pk=pk,
+                is_used=False,
+                expires_at__gt=timezone.now(),
+            ).update(is_used=True)
+        )
+
     def has_expired(self) -> bool:
         return timezone.now() >= self.expires_at
 
@@ -6,12 +6,15 @@ class ProfileSerializer(serializers.ModelSerializer):
     سریالایزر برای مدل پروفایل جهت نمایش اطلاعات پایه کاربر.
     """
     # متد زیر نام کامل کاربر را برمی‌گرداند
-    full_name = serializers.CharField(source='__str__', read_only=True)
+    full_name = serializers.SerializerMethodField()
 
     class Meta:
         model = Profile
         fields = ['id', 'user', 'role', 'first_name', 'last_name', 'phone_number', 'email', 'profile_picture', 'telegram_chat_id', 'full_name']
 
+    def get_full_name(self, obj):
+        return obj.get_full_name()
+
 
 class AdvisorSerializer(serializers.ModelSerializer):
     """
@@ -21,7 +24,7 @@ class AdvisorSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Advisor
-        fields = ['id', 'profile', 'bio']
+        fields = ['id', 'profile']
 
 
 class StudentSerializer(serializers.ModelSerializer):
@@ -0,0 +1,26 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_login_phone_cache
+from .models import Profile
+
+
+def _touches_fields(kwargs, fields):
+    update_fields = kwargs.get("update_fields")
+    return not update_fields or bool(set(update_fields) & fields)
+
+
+@receiver(post_save, sender=Profile, dispatch_uid="accounts.profile_login_phone_saved")
+@receiver(post_delete, sender=Profile, dispatch_uid="accounts.profile_login_phone_deleted")
+def invalidate_profile_login_phone(sender, instance, **kwargs):
+    if instance.phone_number and _touches_fields(kwargs, {"phone_number"}):
+        invalidate_login_phone_cache(instance.phone_number)
+
+
+@receiver(post_save, sender=User, dispatch_uid="accounts.user_login_phone_saved")
+@receiver(post_delete, sender=User, dispatch_uid="accounts.user_login_phone_deleted")
+def invalidate_user_login_phone(sender, instance, **kwargs):
+    # ``login()`` saves ``last_login`` only; that must not evict the entry.
+    if _touches_fields(kwargs, {"username", "is_active"}):
+        invalidate_login_phone_cache(instance.get_username())
@@ -1,3 +1,272 @@
-from django.test import TestCase
+import json
+import re
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.conf import settings
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Advisor, Grade, LoginOTP, Major, Profile, School, Student
+from .serializers import StudentSerializer
+from .views import _get_user_for_phone
+
+
+class AdvisorDetailTests(TestCase):
+    def setUp(self):
+        self.school = School.objects.create(name="مدرسه تست")
+        self.major = Major.objects.create(name="ریاضی")
+        self.grade = Grade.objects.create(name="دهم")
+        advisor_user = User.objects.create_user(username="advisor-detail")
+        advisor_profile = Profile.objects.create(
+            user=advisor_user,
+            role="advisor",
+            first_name="مشاور",
+            last_name="تست",
+        )
+        self.advisor = Advisor.objects.create(profile=advisor_profile)
+
+    def add_student(self, username):
+        user = User.objects.create_user(username=username)
+        profile = Profile.objects.create(
+            user=user,
+            role="student",
+            first_name=username,
+            last_name="دانش‌آموز",
+        )
+        return Student.objects.create(
+            profile=profile,
+            school=self.school,
+            major=self.major,
+            grade=self.grade,
+            advisor=self.advisor,
+        )
+
+    def test_student_list_query_count_is_constant(self):
+        for index in range(5):
+            self.add_student(f"student-{index}")
+
+        url = reverse("advisor_detail", args=[self.advisor.pk])
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "student-4")
+        self.assertContains(response, self.major.name)
+        self.assertContains(response, self.grade.name)
+
+    def test_student_serializer_is_flat_with_select_related(self):
+        for index in range(3):
+            self.add_student(f"serialized-{index}")
+
+        queryset = (
+            Student.objects.filter(advisor=self.advisor)
+            .select_related("profile__user", "advisor__profile__user", "major", "grade")
+            .order_by("id")
+        )
+        with self.assertNumQueries(1):
+            data = StudentSerializer(queryset, many=True).data
+
+        self.assertEqual(len(data), 3)
+        self.assertEqual(data[0]["profile"]["full_name"], "serialized-0 دانش‌آموز")
+        self.assertEqual(data[0]["advisor"]["profile"]["full_name"], "مشاور تست")
+
+
+class PhoneLookupCacheTests(TestCase):
+    phone = "+989121112233"
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="phone-lookup")
+        self.profile = Profile.objects.create(
+            user=self.user,
+            role="student",
+            first_name="شماره",
+            last_name="تست",
+            phone_number="09121112233",
+        )
+
+    def test_repeated_lookup_uses_cached_user_id(self):
+        self.assertEqual(_get_user_for_phone(self.phone), self.user)
+        with self.assertNumQueries(1):
+            self.assertEqual(_get_user_for_phone(self.phone), self.user)
+
+    def test_unknown_number_is_tombstoned_until_a_profile_claims_it(self):
+        unknown = "+989129998877"
+        self.assertIsNone(_get_user_for_phone(unknown))
+        with self.assertNumQueries(0):
+            self.assertIsNone(_get_user_for_phone(unknown))
+
+        self.profile.phone_number = "09129998877"
+        self.profile.save()
+        self.assertEqual(_get_user_for_phone(unknown), self.user)
+        self.assertIsNone(_get_user_for_phone(self.phone))
+
+    def test_inactive_user_is_not_returned_from_cache(self):
+        self.assertEqual(_get_user_for_phone(self.phone), self.user)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertIsNone(_get_user_for_phone(self.phone))
+
+
+class LoginOTPFlowTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="otp-user")
+        Profile.objects.create(
+            user=self.user,
+            role="student",
+            first_name="کد",
+            last_name="تست",
+            phone_number="09123334455",
+        )
+
+    def post_json(self, name, payload):
+        return self.client.post(
+            reverse(name),
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+
+    @patch("accounts.views.send_sms_message")
+    def test_send_respects_cooldown_and_verify_logs_in(self, send_sms):
+        sent = self.post_json("login-send-otp", {"phone_number": "09123334455"})
+        self.assertEqual(sent.status_code, 200, sent.content)
+        self.assertEqual(send_sms.call_count, 1)
+
+        again = self.post_json("login-send-otp", {"phone_number": "09123334455"})
+        self.assertEqual(again.status_code, 429)
+        self.assertGreaterEqual(again.json()["retry_after"], 1)
+        self.assertEqual(send_sms.call_count, 1)
+
+        code = send_sms.call_args.args[1].split(": ", 1)[1].split("\n", 1)[0]
+        wrong = self.post_json(
+            "login-verify-otp",
+            {"phone_number": "09123334455", "code": "000000" if code != "000000" else "111111"},
+        )
+        self.assertEqual(wrong.status_code, 400)
+
+        verified = self.post_json(
+            "login-verify-otp", {"phone_number": "09123334455", "code": code}
+        )
+        self.assertEqual(verified.status_code, 200, verified.content)
+        self.assertEqual(int(self.client.session["_auth_user_id"]), self.user.pk)
+
+    @patch("accounts.views.send_sms_message")
+    def test_code_cannot_be_replayed_and_survives_cache_loss(self, send_sms):
+        self.post_json("login-send-otp", {"phone_number": "09123334455"})
+        code = send_sms.call_args.args[1].split(": ", 1)[1].split("\n", 1)[0]
+        payload = {"phone_number": "09123334455", "code": code}
+
+        cache.delete("otp:+989123334455")
+        self.assertEqual(self.post_json("login-verify-otp", payload).status_code, 200)
+        self.client.logout()
+        self.assertEqual(self.post_json("login-verify-otp", payload).status_code, 400)
+
+    @patch("accounts.views.send_sms_message")
+    def test_cooldown_holds_when_the_cache_entry_is_missing(self, send_sms):
+        # Another worker with its own cache sees only the database row.
+        self.post_json("login-send-otp", {"phone_number": "09123334455"})
+        cache.delete("otp_cd:+989123334455")
+        again = self.post_json("login-send-otp", {"phone_number": "09123334455"})
+        self.assertEqual(again.status_code, 429)
+        self.assertGreaterEqual(again.json()["retry_after"], 1)
+        self.assertEqual(send_sms.call_count, 1)
+
+    @patch("accounts.views.send_sms_message", side_effect=ValueError("sms down"))
+    def test_failed_send_releases_cooldown(self, send_sms):
+        failed = self.post_json("login-send-otp", {"phone_number": "09123334455"})
+        self.assertEqual(failed.status_code, 400)
+        self.assertFalse(LoginOTP.objects.exists())
+
+        send_sms.side_effect = None
+        retried = self.post_json("login-send-otp", {"phone_number": "09123334455"})
+        self.assertEqual(retried.status_code, 200, retried.content)
+
+    @patch("accounts.views.send_sms_message")
+    def test_new_code_retires_previous_codes(self, send_sms):
+        stale = LoginOTP.create_for_phone("+989123334455", "123456", ttl_seconds=300)
+        LoginOTP.objects.filter(pk=stale.pk).update(
+            created_at=stale.created_at.replace(year=stale.created_at.year - 1)
+        )
+
+        sent = self.post_json("login-send-otp", {"phone_number": "09123334455"})
+        self.assertEqual(sent.status_code, 200, sent.content)
+        self.assertEqual(
+            LoginOTP.objects.filter(phone_number="+989123334455", is_used=False).count(),
+            1,
+        )
+        stale.refresh_from_db()
+        self.assertTrue(stale.is_used)
+
+
+class ExpireLoginOTPsCommandTests(TestCase):
+    def test_only_expired_pending_codes_are_retired(self):
+        expired = LoginOTP.create_for_phone("+989120000000", "111111", ttl_seconds=60)
+        LoginOTP.objects.filter(pk=expired.pk).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        live = LoginOTP.create_for_phone("+989120000001", "222222", ttl_seconds=60)
+
+        out = StringIO()
+        call_command("expire_login_otps", stdout=out)
+
+        expired.refresh_from_db()
+        live.refresh_from_db()
+        self.assertTrue(expired.is_used)
+        self.assertFalse(live.is_used)
+        self.assertIn("1 expired code(s)", out.getvalue())
+
+
+class LoginPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_cookieless_visitors_share_one_cached_render(self):
+        first = Client().get(reverse("login"))
+        self.assertEqual(first.status_code, 200)
+
+        with patch("accounts.views.render_to_string") as render_to_string:
+            second = Client().get(reverse("login"))
+        render_to_string.assert_not_called()
+        self.assertEqual(second.status_code, 200)
+        self.assertIn(settings.CSRF_COOKIE_NAME, second.cookies)
+        self.assertNotIn(b"login-page-csrf-token", second.content)
+
+    def test_each_cookieless_visitor_gets_its_own_csrf_cookie(self):
+        for username in ("csrf-first", "csrf-second"):
+            client = Client(enforce_csrf_checks=True)
+            page = client.get(reverse("login"))
+            self.assertEqual(page.status_code, 200)
+            self.assertIn(settings.CSRF_COOKIE_NAME, page.cookies)
+            form_token = re.search(
+                rb'name="csrfmiddlewaretoken" value="([^"]+)"', page.content
+            ).group(1).decode()
+            User.objects.create_user(username=username, password="secret-pass")
+            posted = client.post(
+                reverse("login"),
+                {"username": username, "password": "secret-pass", "csrfmiddlewaretoken": form_token},
+            )
+            self.assertRedirects(posted, reverse("plan"), fetch_redirect_response=False)
+
+    def test_authenticated_user_is_redirected_past_the_cached_page(self):
+        self.client.get(reverse("login"))
+        user = User.objects.create_user(username="cached-login")
+        self.client.force_login(user)
+        response = self.client.get(reverse("login"))
+        self.assertRedirects(response, reverse("plan"), fetch_redirect_response=False)
+
+
+class LoginOTPModelTests(TestCase):
+    def test_mark_attempt_increments_without_reloading(self):
+        otp = LoginOTP.create_for_phone("+989120000002", "333333", ttl_seconds=60)
+        with self.assertNumQueries(1):
+            self.assertEqual(otp.mark_attempt(), 1)
+        self.assertEqual(otp.mark_attempt(), 2)
+        otp.refresh_from_db()
+        self.assertEqual(otp.attempt_count, 2)
 
-# Create your tests here.
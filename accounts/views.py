@@ -1,22 +1,44 @@
 import json
-import random
-import re
+import secrets
+import time
 
 from django.contrib.auth import authenticate, get_user_model, login
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, IntegerField, Q, Value
 from django.shortcuts import redirect, render
-from django.utils import timezone
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
 from django.views.decorators.http import require_http_methods
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.urls import reverse
 
 from management.utils import normalize_phone_number, send_sms_message
 
-from .models import Advisor, LoginOTP, Profile
+from .cache import (
+    LOGIN_PHONE_CACHE_TTL,
+    LOGIN_PHONE_MISSING,
+    LOGIN_PHONE_MISSING_TTL,
+    candidate_phone_values,
+    login_phone_cache_key,
+    phone_digits,
+)
+from .models import Advisor, LoginOTP, Profile, Student
 
 def advisor_detail(request, advisor_id):
     try:
-        advisor = Advisor.objects.get(id=advisor_id)
-        students = advisor.student_set.all() 
+        advisor = Advisor.objects.select_related('profile').get(id=advisor_id)
+        students = (
+            Student.objects.filter(advisor=advisor)
+            .select_related('profile', 'major', 'grade')
+            .only(
+                'advisor_id',
+                'profile__first_name',
+                'profile__last_name',
+                'major__name',
+                'grade__name',
+            )
+        )
     except Advisor.DoesNotExist:
         advisor = None
         students = []
@@ -25,9 +47,15 @@ def advisor_detail(request, advisor_id):
 
 
 PASSWORD_ERROR_MESSAGE = "نام کاربری یا رمز عبور نادرست است."
+LOGIN_PAGE_CACHE_TTL = 60 * 5
+LOGIN_PAGE_CACHE_KEY = 'login_page:html'
+LOGIN_PAGE_CSRF_PLACEHOLDER = 'login-page-csrf-token'
 OTP_RESEND_INTERVAL = 60  # seconds
 OTP_CODE_TTL = 5 * 60  # seconds
 OTP_MAX_ATTEMPTS = 5
+OTP_LOGIN_BACKEND = 'django.contrib.auth.backends.ModelBackend'
+OTP_COOLDOWN_CACHE_PREFIX = 'otp_cd:'
+OTP_CACHE_PREFIX = 'otp:'
 
 
 def _load_request_data(request):
@@ -39,45 +67,74 @@ def _load_request_data(request):
     return request.POST
 
 
-def _candidate_phone_values(normalized_phone: str):
-    digits = re.sub(r'\D', '', normalized_phone or '')
-    candidates = {normalized_phone}
-    if len(digits) >= 10:
-        last_ten = digits[-10:]
-        candidates.add(last_ten)
-        candidates.add('0' + last_ten)
-        candidates.add('+98' + last_ten)
-    return list({value for value in candidates if value})
+def _lookup_user_for_phone(candidates):
+    # One round trip: a UNION keeps each branch on its own index (profile phone
+    # number, unique username) where an OR across the join would scan users.
+    # Profile matches still win over username matches, as before.
+    UserModel = get_user_model()
+    by_profile_phone = (
+        UserModel.objects.filter(profile__phone_number__in=candidates, is_active=True)
+        .annotate(match_rank=Value(0, output_field=IntegerField()), profile_rank=F('profile__id'))
+    )
+    by_username = (
+        UserModel.objects.filter(username__in=candidates, is_active=True)
+        .annotate(match_rank=Value(1, output_field=IntegerField()), profile_rank=F('profile__id'))
+    )
+    return (
+        by_profile_phone.union(by_username)
+        .order_by('match_rank', 'profile_rank', 'id')
+        .first()
+    )
 
 
 def _get_user_for_phone(normalized_phone: str):
-    candidates = _candidate_phone_values(normalized_phone)
+    candidates = candidate_phone_values(normalized_phone)
     if not candidates:
         return None
 
-    profile = (
-        Profile.objects.select_related('user')
-        .filter(phone_number__in=candidates)
-        .order_by('id')
-        .first()
-    )
-    if profile and profile.user.is_active:
-        return profile.user
-
     UserModel = get_user_model()
-    user = (
-        UserModel.objects.filter(username__in=candidates)
-        .order_by('id')
-        .first()
-    )
-    if user and user.is_active:
-        return user
-    return None
+    cache_key = login_phone_cache_key(normalized_phone)
+    cached_pk = cache.get(cache_key)
+    if cached_pk == LOGIN_PHONE_MISSING:
+        return None
+    if cached_pk is not None:
+        # Re-check the phone/username match so a stale entry can never log
+        # somebody into an account that no longer owns this number.
+        user = (
+            UserModel.objects.filter(pk=cached_pk, is_active=True)
+            .filter(Q(profile__phone_number__in=candidates) | Q(username__in=candidates))
+            .first()
+        )
+        if user:
+            return user
+
+    user = _lookup_user_for_phone(candidates)
+    if user is None:
+        cache.set(cache_key, LOGIN_PHONE_MISSING, LOGIN_PHONE_MISSING_TTL)
+        return None
+    cache.set(cache_key, user.pk, LOGIN_PHONE_CACHE_TTL)
+    return user
+
+
+def _render_cached_login(request):
+    # Only reached for anonymous GETs. Apart from the CSRF token the page is
+    # the same for every visitor, so one render is shared through the cache
+    # and each request fills in its own token; get_token() also has the CSRF
+    # middleware set the cookie for first-time visitors.
+    page = cache.get(LOGIN_PAGE_CACHE_KEY)
+    if page is None:
+        page = render_to_string(
+            "accounts/login.html", {"csrf_token": LOGIN_PAGE_CSRF_PLACEHOLDER}
+        )
+        cache.set(LOGIN_PAGE_CACHE_KEY, page, LOGIN_PAGE_CACHE_TTL)
+    return HttpResponse(page.replace(LOGIN_PAGE_CSRF_PLACEHOLDER, get_token(request)))
 
 
 def login_view(request):
     if request.user.is_authenticated:
         return redirect("plan")
+    if request.method == "GET":
+        return _render_cached_login(request)
     if request.method == "POST":
         username = request.POST.get("username")
         password = request.POST.get("password")
@@ -92,6 +149,13 @@ def login_view(request):
     return render(request, "accounts/login.html")
 
 
+def _otp_cooldown_response(retry_after):
+    return JsonResponse({
+        'detail': 'کد تایید قبلا ارسال شده است. لطفا چند لحظه صبر کنید.',
+        'retry_after': max(retry_after, 1),
+    }, status=429)
+
+
 @require_http_methods(["POST"])
 def request_login_otp(request):
     data = _load_request_data(request)
@@ -100,37 +164,52 @@ def request_login_otp(request):
         return JsonResponse({'detail': 'شماره موبایل الزامی است.'}, status=400)
 
     normalized = normalize_phone_number(raw_phone)
-    if not normalized or len(re.sub(r'\D', '', normalized)) < 10:
+    if not normalized or len(phone_digits(normalized)) < 10:
         return JsonResponse({'detail': 'شماره موبایل وارد شده معتبر نیست.'}, status=400)
 
     user = _get_user_for_phone(normalized)
     if not user:
         return JsonResponse({'detail': 'حساب کاربری با این شماره موبایل یافت نشد.'}, status=404)
 
-    now = timezone.now()
-    recent = (
-        LoginOTP.objects.filter(phone_number=normalized, is_used=False)
-        .order_by('-created_at')
-        .first()
-    )
-    if recent and (now - recent.created_at).total_seconds() < OTP_RESEND_INTERVAL:
-        retry_after = OTP_RESEND_INTERVAL - int((now - recent.created_at).total_seconds())
-        return JsonResponse({
-            'detail': 'کد تایید قبلا ارسال شده است. لطفا چند لحظه صبر کنید.',
-            'retry_after': max(retry_after, 1),
-        }, status=429)
-
-    LoginOTP.objects.filter(phone_number=normalized, expires_at__lt=now).update(is_used=True)
-
-    code = f"{random.randint(100000, 999999)}"
-    otp = LoginOTP.create_for_phone(normalized, code, ttl_seconds=OTP_CODE_TTL)
-    LoginOTP.objects.filter(phone_number=normalized, is_used=False).exclude(pk=otp.pk).update(is_used=True)
+    # ``cache.add`` is an atomic set-if-absent, so bursts of resends handled by
+    # the same cache are rejected without touching the OTP table. The cache
+    # may be per-process, so the latest pending code stays authoritative.
+    cooldown_key = f'{OTP_COOLDOWN_CACHE_PREFIX}{normalized}'
+    now_ts = time.time()
+    if not cache.add(cooldown_key, now_ts, OTP_RESEND_INTERVAL):
+        sent_at = cache.get(cooldown_key) or now_ts
+        return _otp_cooldown_response(OTP_RESEND_INTERVAL - int(now_ts - sent_at))
+
+    with transaction.atomic():
+        # Lock the latest pending code so concurrent sends for the same number
+        # serialize on the cooldown check instead of both inserting a code.
+        recent = (
+            LoginOTP.objects.select_for_update()
+            .filter(phone_number=normalized, is_used=False)
+            .order_by('-created_at')
+            .only('created_at')
+            .first()
+        )
+        if recent:
+            elapsed = now_ts - recent.created_at.timestamp()
+            if elapsed < OTP_RESEND_INTERVAL:
+                # Another worker sent it; remember the real send time here too.
+                cache.set(cooldown_key, recent.created_at.timestamp(), OTP_RESEND_INTERVAL - int(elapsed))
+                return _otp_cooldown_response(OTP_RESEND_INTERVAL - int(elapsed))
+
+        # Retire every earlier code (expired or not) before issuing the new one.
+        LoginOTP.objects.filter(phone_number=normalized, is_used=False).update(is_used=True)
+        code = f"{secrets.randbelow(900000) + 100000:06d}"
+        otp = LoginOTP.create_for_phone(normalized, code, ttl_seconds=OTP_CODE_TTL)
+    otp_cache_key = f'{OTP_CACHE_PREFIX}{normalized}'
+    cache.set(otp_cache_key, {'id': otp.pk, 'code': code}, OTP_CODE_TTL)
 
     message = f"کد ورود شما: {code}\nپنل کیمیاگرخونه"
     try:
         send_sms_message(normalized, message)
     except Exception as exc:
         otp.delete()
+        cache.delete_many([cooldown_key, otp_cache_key])
         return JsonResponse({'detail': str(exc)}, status=400)
 
     return JsonResponse({'detail': 'کد تایید برای شما ارسال شد.', 'expires_in': OTP_CODE_TTL})
@@ -147,6 +226,17 @@ def verify_login_otp(request):
 
     normalized = normalize_phone_number(raw_phone)
 
+    # Fast path: the code issued by request_login_otp is cached, so a correct
+    # code is consumed with one conditional UPDATE and no SELECT. Anything
+    # else (cache miss, another worker's stale entry, wrong code) falls back
+    # to the database row, which stays the source of truth.
+    otp_cache_key = f'{OTP_CACHE_PREFIX}{normalized}'
+    cached_otp = cache.get(otp_cache_key)
+    if cached_otp and cached_otp.get('code') == code:
+        cache.delete(otp_cache_key)
+        if LoginOTP.consume(cached_otp.get('id')):
+            return _complete_otp_login(request, normalized)
+
     otp = (
         LoginOTP.objects.filter(phone_number=normalized)
         .order_by('-created_at')
@@ -161,17 +251,23 @@ def verify_login_otp(request):
         return JsonResponse({'detail': 'کد تایید منقضی شده است. لطفا دوباره درخواست دهید.'}, status=400)
 
     if otp.code != code:
-        otp.mark_attempt()
-        if otp.attempt_count >= OTP_MAX_ATTEMPTS:
+        if otp.mark_attempt() >= OTP_MAX_ATTEMPTS:
             otp.mark_used()
+            cache.delete(otp_cache_key)
             return JsonResponse({'detail': 'دفعات تلاش بیش از حد مجاز بود. لطفا دوباره کد دریافت کنید.'}, status=429)
         return JsonResponse({'detail': 'کد تایید وارد شده صحیح نیست.'}, status=400)
 
-    user = _get_user_for_phone(normalized)
+    otp.mark_used()
+    cache.delete(otp_cache_key)
+    return _complete_otp_login(request, normalized)
+
+
+def _complete_otp_login(request, normalized_phone):
+    user = _get_user_for_phone(normalized_phone)
     if not user:
-        otp.mark_used()
         return JsonResponse({'detail': 'حساب کاربری مرتبط یافت نشد.'}, status=404)
 
-    otp.mark_used()
-    login(request, user)
+    # The code has already proven ownership, so name the backend instead of
+    # letting login() walk AUTHENTICATION_BACKENDS to pick one.
+    login(request, user, backend=OTP_LOGIN_BACKEND)
     return JsonResponse({'redirect': reverse('plan')})
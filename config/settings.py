@@ -93,6 +93,30 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Login OTP cooldowns and phone lookups live in the cache, so every worker
+# must share it. Point REDIS_URL at a Redis instance in production; the
+# per-process local-memory cache is only suitable for a single worker.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# With a shared cache, sessions are read from it and only fall back to the
+# database on a miss, so authenticated requests stop paying a session SELECT.
+# A per-process cache would keep serving sessions that another worker has
+# flushed on logout, so without Redis sessions stay purely database-backed.
+if os.environ.get('REDIS_URL'):
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
 LOGIN_REDIRECT_URL = '/plan/'
 LOGIN_URL = '/login/'
 LOGOUT_REDIRECT_URL = '/login/'
@@ -117,3 +141,10 @@ KAVENEGAR_API_KEY = os.environ.get(
     '7A724E712B39625A6D4C496D375467527A554D316B31676C79757678696F674B5570684C6C52534F7063343D',
 )
 KAVENEGAR_SENDER = os.environ.get('KAVENEGAR_SENDER', '')
+
+# Rows per INSERT when fanning a notification out to its recipients.
+NOTIFICATION_BULK_BATCH_SIZE = int(os.environ.get('NOTIFICATION_BULK_BATCH_SIZE', '500'))
+# Background threads per delivery channel (telegram, sms) in each worker.
+NOTIFICATION_DELIVERY_WORKERS = int(os.environ.get('NOTIFICATION_DELIVERY_WORKERS', '4'))
+# Threads used to run the independent admin report queries concurrently.
+ADMIN_REPORT_QUERY_WORKERS = int(os.environ.get('ADMIN_REPORT_QUERY_WORKERS', '4'))
@@ -173,9 +173,67 @@ PrivateTmp=true
 WantedBy=multi-user.target
 EOF
 
+cat > "/etc/systemd/system/${SERVICE_NAME}-expire-otps.service" <<EOF
+[Unit]
+Description=KimiagarKhune expired login OTP sweep
+After=mysql.service
+Requires=mysql.service
+
+[Service]
+Type=oneshot
+User=www-data
+Group=www-data
+WorkingDirectory=$APP_DIR
+EnvironmentFile=$ENV_FILE
+ExecStart=$APP_DIR/venv/bin/python manage.py expire_login_otps
+EOF
+
+cat > "/etc/systemd/system/${SERVICE_NAME}-expire-otps.timer" <<EOF
+[Unit]
+Description=Run the KimiagarKhune login OTP sweep every minute
+
+[Timer]
+OnBootSec=1min
+OnUnitActiveSec=1min
+AccuracySec=5s
+
+[Install]
+WantedBy=timers.target
+EOF
+
+cat > "/etc/systemd/system/${SERVICE_NAME}-resend-notifications.service" <<EOF
+[Unit]
+Description=KimiagarKhune pending notification delivery sweep
+After=mysql.service
+Requires=mysql.service
+
+[Service]
+Type=oneshot
+User=www-data
+Group=www-data
+WorkingDirectory=$APP_DIR
+EnvironmentFile=$ENV_FILE
+ExecStart=$APP_DIR/venv/bin/python manage.py resend_pending_notifications
+EOF
+
+cat > "/etc/systemd/system/${SERVICE_NAME}-resend-notifications.timer" <<EOF
+[Unit]
+Description=Run the KimiagarKhune pending notification sweep every five minutes
+
+[Timer]
+OnBootSec=5min
+OnUnitActiveSec=5min
+AccuracySec=30s
+
+[Install]
+WantedBy=timers.target
+EOF
+
 systemctl daemon-reload
 systemctl enable "$SERVICE_NAME"
 systemctl restart "$SERVICE_NAME"
+systemctl enable --now "${SERVICE_NAME}-expire-otps.timer"
+systemctl enable --now "${SERVICE_NAME}-resend-notifications.timer"
 
 echo "==> Configuring Nginx"
 write_http_nginx() {
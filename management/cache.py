@@ -0,0 +1,39 @@
+import time
+
+from django.core.cache import cache
+
+ADMIN_REPORT_CACHE_PREFIX = 'admin_report:'
+ADMIN_REPORT_CACHE_VERSION_KEY = 'admin_report:version'
+ADMIN_REPORT_CACHE_TTL = 60  # seconds
+
+NOTIFICATION_TARGETS_CACHE_PREFIX = 'notification_targets:'
+NOTIFICATION_TARGETS_CACHE_VERSION_KEY = 'notification_targets:version'
+NOTIFICATION_TARGETS_CACHE_TTL = 60  # seconds
+
+
+def cache_version(version_key):
+    version = cache.get(version_key)
+    if version is None:
+        # Seed from the clock so an evicted counter never reuses an old version.
+        cache.add(version_key, time.time_ns(), None)
+        version = cache.get(version_key)
+    return version
+
+
+def bump_cache_version(version_key):
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.set(version_key, time.time_ns(), None)
+
+
+def invalidate_admin_report_cache():
+    """Retire every cached admin report by bumping the shared version."""
+
+    bump_cache_version(ADMIN_REPORT_CACHE_VERSION_KEY)
+
+
+def invalidate_notification_targets_cache():
+    """Retire every cached recipient picker list by bumping the shared version."""
+
+    bump_cache_version(NOTIFICATION_TARGETS_CACHE_VERSION_KEY)
@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from management import tasks
+from management.models import NotificationRecipient
+
+
+DEFAULT_STALE_MINUTES = 30
+DEFAULT_MAX_AGE_HOURS = 24
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue Telegram and SMS deliveries again for notification recipients that "
+        "were never sent, have no recorded error and whose delivery claim has gone "
+        "stale, e.g. because the web worker holding them restarted. Intended to "
+        "run every few minutes from a timer."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stale-minutes",
+            type=int,
+            default=DEFAULT_STALE_MINUTES,
+            help="Only pick up deliveries not queued or picked up for this many minutes.",
+        )
+        parser.add_argument(
+            "--max-age-hours",
+            type=int,
+            default=DEFAULT_MAX_AGE_HOURS,
+            help="Give up on notifications created longer ago than this.",
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        stale_before = now - timedelta(minutes=max(1, options["stale_minutes"]))
+        oldest = now - timedelta(hours=max(1, options["max_age_hours"]))
+
+        pending_telegram = Q(
+            notification__send_via_telegram=True, telegram_sent=False, telegram_error__isnull=True
+        )
+        pending_sms = Q(notification__send_via_sms=True, sms_sent=False, sms_error__isnull=True)
+        rows = NotificationRecipient.objects.filter(
+            pending_telegram | pending_sms,
+            delivery_claimed_at__gte=oldest,
+            delivery_claimed_at__lt=stale_before,
+            created_at__gte=oldest,
+        ).values_list(
+            "id",
+            "delivery_claimed_at",
+            "notification__message",
+            "notification__send_via_telegram",
+            "notification__send_via_sms",
+            "telegram_sent",
+            "telegram_error",
+            "sms_sent",
+            "sms_error",
+            "user__profile__telegram_chat_id",
+            "user__profile__phone_number",
+        )
+
+        jobs = []
+        for (
+            recipient_id, claimed_at, message, via_telegram, via_sms,
+            telegram_sent, telegram_error, sms_sent, sms_error,
+            chat_id, phone_number,
+        ) in rows:
+            # Take the claim over only if nobody refreshed it since it was
+            # read, so a worker that just picked the row up keeps it and two
+            # overlapping sweeps never both queue it.
+            claimed = NotificationRecipient.objects.filter(
+                pk=recipient_id, delivery_claimed_at=claimed_at,
+            ).update(delivery_claimed_at=now)
+            if not claimed:
+                continue
+            if via_telegram and chat_id and not telegram_sent and telegram_error is None:
+                jobs.append(("telegram", recipient_id, chat_id, message))
+            if via_sms and phone_number and not sms_sent and sms_error is None:
+                jobs.append(("sms", recipient_id, phone_number, message))
+
+        # Outside a transaction the deliveries are dispatched straight away.
+        tasks.enqueue_deliveries(jobs)
+        tasks.wait_for_deliveries()
+
+        if options["verbosity"] > 1 or jobs:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Pending notification sweep complete: {len(jobs)} delivery(ies) queued again."
+                )
+            )
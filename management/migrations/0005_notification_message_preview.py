@@ -0,0 +1,33 @@
+from django.db import migrations, models
+
+
+def fill_message_previews(apps, schema_editor):
+    Notification = apps.get_model('management', 'Notification')
+    batch = []
+    for notification in Notification.objects.only('id', 'message').iterator(chunk_size=500):
+        preview = (notification.message or '').strip()
+        if len(preview) > 48:
+            preview = f"{preview[:45]}..."
+        notification.message_preview = preview
+        batch.append(notification)
+        if len(batch) >= 500:
+            Notification.objects.bulk_update(batch, ['message_preview'])
+            batch = []
+    if batch:
+        Notification.objects.bulk_update(batch, ['message_preview'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0004_chat_and_recipient_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='message_preview',
+            field=models.CharField(blank=True, default='', editable=False, max_length=48),
+        ),
+        migrations.RunPython(fill_message_previews, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0007_payment_student_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationrecipient',
+            name='delivery_claimed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='زمان آخرین صف ارسال'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationrecipient',
+            index=models.Index(fields=['delivery_claimed_at'], name='management_nr_claim_idx'),
+        ),
+    ]
@@ -21,6 +21,12 @@ class Payment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     admin_notes = models.TextField(blank=True, null=True, verbose_name="یادداشت ادمین")
 
+    class Meta:
+        indexes = [
+            # A student's payment history, newest first.
+            models.Index(fields=['student', '-created_at'], name='management_pay_student_idx'),
+        ]
+
     def __str__(self):
         return f"پرداختی از {self.student} به مبلغ {self.amount}"
 
@@ -41,6 +47,12 @@ class ChatMessage(models.Model):
     
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            models.Index(fields=['receiver', 'is_read'], name='management_cm_recv_read_idx'),
+            models.Index(fields=['sender', 'receiver', 'timestamp'], name='management_cm_send_recv_idx'),
+            models.Index(fields=['receiver', 'sender', 'timestamp'], name='management_cm_recv_send_idx'),
+            models.Index(fields=['timestamp'], name='management_cm_timestamp_idx'),
+        ]
 
 
 class Notification(models.Model):
@@ -59,11 +71,24 @@ class Notification(models.Model):
     send_via_telegram = models.BooleanField(default=False, verbose_name='ارسال تلگرام')
     send_via_sms = models.BooleanField(default=False, verbose_name='ارسال پیامک')
     created_at = models.DateTimeField(auto_now_add=True)
+    message_preview = models.CharField(max_length=48, blank=True, default='', editable=False)
 
-    def __str__(self):
-        preview = (self.message or '').strip()
+    @staticmethod
+    def build_preview(message):
+        preview = (message or '').strip()
         if len(preview) > 48:
             preview = f"{preview[:45]}..."
+        return preview
+
+    def save(self, *args, **kwargs):
+        self.message_preview = self.build_preview(self.message)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'message' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'message_preview'}
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        preview = self.message_preview
         return f"اعلان {self.id}: {preview}" if preview else f"اعلان {self.id}"
 
 
@@ -87,10 +112,20 @@ class NotificationRecipient(models.Model):
     sms_sent = models.BooleanField(default=False, verbose_name='پیامک ارسال شد')
     telegram_error = models.TextField(blank=True, null=True, verbose_name='خطای تلگرام')
     sms_error = models.TextField(blank=True, null=True, verbose_name='خطای پیامک')
+    # Set when Telegram/SMS deliveries are queued and refreshed when a worker
+    # picks them up; the pending-delivery sweep only takes rows whose claim
+    # has gone stale.
+    delivery_claimed_at = models.DateTimeField(
+        blank=True, null=True, editable=False, verbose_name='زمان آخرین صف ارسال',
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         unique_together = ('notification', 'user')
+        indexes = [
+            models.Index(fields=['user', 'is_read', '-created_at'], name='management_nr_user_read_idx'),
+            models.Index(fields=['delivery_claimed_at'], name='management_nr_claim_idx'),
+        ]
 
     def __str__(self):
         return f"اعلان {self.notification_id} برای {self.user_id}"
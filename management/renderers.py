@@ -0,0 +1,32 @@
+"""Response renderers for the large admin report payloads."""
+
+import json
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements.txt
+    orjson = None
+
+
+class ReportJSONRenderer(JSONRenderer):
+    """Encode report payloads with orjson when it is installed.
+
+    The report is made of plain dicts, lists, strings and numbers, so orjson's
+    output matches DRF's compact UTF-8 JSON; anything else falls back to the
+    stock renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data, default=str)
+
+
+def dumps_indented(data):
+    """Pretty-print ``data`` as UTF-8 JSON bytes for file downloads."""
+
+    if orjson is not None:
+        return orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, ensure_ascii=False, indent=2, default=str).encode('utf-8')
@@ -28,17 +28,27 @@ class UserProfileSerializer(serializers.ModelSerializer):
         except ValueError:
             return None
         if request:
-            return request.build_absolute_uri(url)
+            if not url.startswith('/') or url.startswith('//'):
+                return request.build_absolute_uri(url)
+            # Build the scheme/host prefix once per serialization, not per row.
+            prefix = self.context.get('_absolute_uri_prefix')
+            if prefix is None:
+                prefix = request.build_absolute_uri('/')[:-1]
+                self.context['_absolute_uri_prefix'] = prefix
+            return prefix + url
         return url
 
 
+PAYMENT_STATUS_LABELS = dict(Payment.STATUS_CHOICES)
+
+
 class PaymentSerializer(serializers.ModelSerializer):
     """
     سریالایزر برای مدل پرداخت‌ها.
     """
     # نمایش نام دانش‌آموز به جای آیدی
     student_name = serializers.CharField(source='student.profile.get_full_name', read_only=True)
-    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    status_display = serializers.SerializerMethodField()
 
     class Meta:
         model = Payment
@@ -57,6 +67,9 @@ class PaymentSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['student_name', 'status_display', 'created_at']
 
+    def get_status_display(self, obj):
+        return PAYMENT_STATUS_LABELS.get(obj.status, obj.status)
+
 
 class ChatMessageSerializer(serializers.ModelSerializer):
     """
@@ -121,43 +134,6 @@ class AdvisorOptionSerializer(serializers.ModelSerializer):
         return ''
 
 
-class NotificationTargetSerializer(serializers.ModelSerializer):
-    """Simple serializer for notification recipient options."""
-
-    user_id = serializers.IntegerField(source='user.id', read_only=True)
-    full_name = serializers.SerializerMethodField()
-    role_display = serializers.SerializerMethodField()
-    student_id = serializers.SerializerMethodField()
-    advisor_id = serializers.SerializerMethodField()
-
-    class Meta:
-        model = Profile
-        fields = [
-            'user_id',
-            'full_name',
-            'role',
-            'role_display',
-            'phone_number',
-            'telegram_chat_id',
-            'student_id',
-            'advisor_id',
-        ]
-
-    def get_full_name(self, obj):
-        return obj.get_full_name()
-
-    def get_role_display(self, obj):
-        return obj.get_role_display()
-
-    def get_student_id(self, obj):
-        student = getattr(obj, 'student', None)
-        return student.id if student else None
-
-    def get_advisor_id(self, obj):
-        advisor = getattr(obj, 'advisor', None)
-        return advisor.id if advisor else None
-
-
 class NotificationRecipientSerializer(serializers.ModelSerializer):
     """Serializer for delivered notifications shown to end users."""
 
@@ -195,9 +171,10 @@ class NotificationRecipientSerializer(serializers.ModelSerializer):
         return 'ادمین'
 
     def get_channels(self, obj):
-        notification = getattr(obj, 'notification', None)
+        # ch_* are annotated by NotificationInboxView straight from the joined
+        # notification row.
         return {
-            'panel': bool(getattr(notification, 'send_via_panel', False)),
-            'telegram': bool(getattr(notification, 'send_via_telegram', False)),
-            'sms': bool(getattr(notification, 'send_via_sms', False)),
+            'panel': obj.ch_panel,
+            'telegram': obj.ch_tg,
+            'sms': obj.ch_sms,
         }
@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import Advisor, Profile, Student
+from plans.models import Course, Session
+
+from .cache import invalidate_admin_report_cache, invalidate_notification_targets_cache
+from .models import ChatMessage
+
+
+@receiver(post_save, sender=Session, dispatch_uid="management.report_session_saved")
+@receiver(post_delete, sender=Session, dispatch_uid="management.report_session_deleted")
+@receiver(post_save, sender=Course, dispatch_uid="management.report_course_saved")
+@receiver(post_delete, sender=Course, dispatch_uid="management.report_course_deleted")
+@receiver(post_save, sender=ChatMessage, dispatch_uid="management.report_chat_saved")
+@receiver(post_delete, sender=ChatMessage, dispatch_uid="management.report_chat_deleted")
+def invalidate_admin_report(sender, instance, **kwargs):
+    # Bulk .update() calls skip these signals; the short report TTL covers them.
+    invalidate_admin_report_cache()
+
+
+@receiver(post_save, sender=Profile, dispatch_uid="management.targets_profile_saved")
+@receiver(post_delete, sender=Profile, dispatch_uid="management.targets_profile_deleted")
+@receiver(post_save, sender=Student, dispatch_uid="management.targets_student_saved")
+@receiver(post_delete, sender=Student, dispatch_uid="management.targets_student_deleted")
+@receiver(post_save, sender=Advisor, dispatch_uid="management.targets_advisor_saved")
+@receiver(post_delete, sender=Advisor, dispatch_uid="management.targets_advisor_deleted")
+def invalidate_notification_targets(sender, instance, **kwargs):
+    # User saves are not watched (every login touches last_login); a renamed
+    # username shows up once the short TTL lapses.
+    invalidate_notification_targets_cache()
@@ -0,0 +1,192 @@
+"""Background delivery of notification messages over Telegram and SMS.
+
+Sends run on small per-channel thread pools so a slow SMS gateway cannot hold
+up Telegram deliveries, and neither holds up the request that queued them.
+SMS recipients sharing a text go out in batches through the gateway's bulk
+send. Each delivery records its outcome on its ``NotificationRecipient`` row.
+
+The pools live in the web worker process, so jobs still queued when a worker
+restarts are lost. Each row carries a ``delivery_claimed_at`` claim, set when
+it is queued and refreshed when a worker picks it up; the
+``resend_pending_notifications`` command, run from a timer, queues rows whose
+claim has gone stale again.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from management.utils import (
+    SMS_BULK_MAX_RECEPTORS,
+    SMSNotAccepted,
+    TelegramNotAccepted,
+    normalize_phone_number,
+    send_sms_bulk,
+    send_telegram_message,
+)
+
+from .models import NotificationRecipient
+
+logger = logging.getLogger(__name__)
+
+DELIVERY_MAX_RETRIES = 3
+DELIVERY_RETRY_BACKOFF = 1  # seconds, doubled after every failed attempt
+
+_executors = {}
+
+
+def _get_executor(channel):
+    executor = _executors.get(channel)
+    if executor is None:
+        workers = getattr(settings, 'NOTIFICATION_DELIVERY_WORKERS', 4)
+        executor = _executors.setdefault(
+            channel,
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'notify-{channel}'),
+        )
+    return executor
+
+
+def _send_with_retry(send, destination, text, retry_on=Exception):
+    """Return ``(result, error)``; only ``retry_on`` failures are attempted again."""
+
+    delay = DELIVERY_RETRY_BACKOFF
+    for attempt in range(DELIVERY_MAX_RETRIES + 1):
+        try:
+            return send(destination, text), ''
+        except Exception as exc:  # noqa: BLE001
+            if attempt == DELIVERY_MAX_RETRIES or not isinstance(exc, retry_on):
+                return None, str(exc) or exc.__class__.__name__
+            time.sleep(delay)
+            delay *= 2
+    return None, ''
+
+
+def deliver_telegram(recipient_id, chat_id, text):
+    close_old_connections()
+    try:
+        # Refresh the claim on pickup. A row the sweep queued again that the
+        # original job has settled in the meantime is left alone.
+        claimed = NotificationRecipient.objects.filter(
+            pk=recipient_id, telegram_sent=False, telegram_error__isnull=True,
+        ).update(delivery_claimed_at=timezone.now())
+        if not claimed:
+            return
+        # Like SMS, only a send known not to have gone out is retried; after a
+        # timeout or a 4xx reply a retry would duplicate or fail the same way.
+        _, error = _send_with_retry(
+            send_telegram_message, chat_id, text, retry_on=TelegramNotAccepted,
+        )
+        NotificationRecipient.objects.filter(pk=recipient_id).update(
+            telegram_sent=not error,
+            telegram_error=error or None,
+        )
+    except Exception:  # noqa: BLE001
+        logger.exception('Telegram delivery for recipient %s failed', recipient_id)
+    finally:
+        close_old_connections()
+
+
+def deliver_sms_batch(recipients, text):
+    """Send ``text`` to ``(recipient_id, phone_number)`` pairs in one request."""
+
+    close_old_connections()
+    try:
+        # Refresh the claim on pickup and drop rows that are already settled.
+        unsettled = set(
+            NotificationRecipient.objects.filter(
+                pk__in=[recipient_id for recipient_id, _ in recipients],
+                sms_sent=False,
+                sms_error__isnull=True,
+            ).values_list('pk', flat=True)
+        )
+        if not unsettled:
+            return
+        NotificationRecipient.objects.filter(pk__in=unsettled).update(
+            delivery_claimed_at=timezone.now(),
+        )
+
+        # Recipients sharing a number get a single SMS and share its outcome.
+        receptors = {}
+        invalid_ids = []
+        for recipient_id, phone_number in recipients:
+            if recipient_id not in unsettled:
+                continue
+            normalized = normalize_phone_number(phone_number)
+            if normalized:
+                receptors.setdefault(normalized, []).append(recipient_id)
+            else:
+                invalid_ids.append(recipient_id)
+        if invalid_ids:
+            NotificationRecipient.objects.filter(pk__in=invalid_ids).update(
+                sms_sent=False,
+                sms_error='شماره موبایل نامعتبر است.',
+            )
+        if receptors:
+            # Only a refused request is sent again; once the gateway has taken
+            # the batch, or may have, a retry would text everyone twice.
+            results, error = _send_with_retry(
+                send_sms_bulk, list(receptors), text, retry_on=SMSNotAccepted,
+            )
+            outcomes = {}
+            for phone_number, recipient_ids in receptors.items():
+                outcome = error or results.get(phone_number, '')
+                outcomes.setdefault(outcome, []).extend(recipient_ids)
+            for outcome, recipient_ids in outcomes.items():
+                NotificationRecipient.objects.filter(pk__in=recipient_ids).update(
+                    sms_sent=not outcome,
+                    sms_error=outcome or None,
+                )
+    except Exception:  # noqa: BLE001
+        logger.exception(
+            'SMS delivery for recipients %s failed',
+            [recipient_id for recipient_id, _ in recipients],
+        )
+    finally:
+        close_old_connections()
+
+
+CHANNEL_TASKS = {
+    'telegram': deliver_telegram,
+    'sms': deliver_sms_batch,
+}
+
+
+def submit_delivery(channel, *args):
+    return _get_executor(channel).submit(CHANNEL_TASKS[channel], *args)
+
+
+def wait_for_deliveries():
+    """Block until every submitted delivery has finished.
+
+    Request workers never call this; it lets a one-off process such as the
+    pending-delivery sweep exit only after its sends are recorded.
+    """
+
+    while _executors:
+        _, executor = _executors.popitem()
+        executor.shutdown(wait=True)
+
+
+def enqueue_deliveries(jobs):
+    """Queue ``(channel, recipient_id, destination, text)`` jobs after commit."""
+
+    jobs = list(jobs)
+    if not jobs:
+        return
+
+    def dispatch():
+        sms_batches = {}
+        for channel, recipient_id, destination, text in jobs:
+            if channel == 'sms':
+                sms_batches.setdefault(text, []).append((recipient_id, destination))
+            else:
+                submit_delivery(channel, recipient_id, destination, text)
+        for text, recipients in sms_batches.items():
+            for start in range(0, len(recipients), SMS_BULK_MAX_RECEPTORS):
+                submit_delivery('sms', recipients[start:start + SMS_BULK_MAX_RECEPTORS], text)
+
+    transaction.on_commit(dispatch)
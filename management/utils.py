@@ -1,12 +1,15 @@
+import base64
+import http.client
 import json
-import re
+import socket
+import threading
 from urllib import parse as urllib_parse
 from urllib import request as urllib_request
-from urllib.error import HTTPError, URLError
 
 from django.conf import settings
 
 PERSIAN_DIGIT_TRANSLATION = str.maketrans('۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', '01234567890123456789')
+PHONE_NUMBER_CHARS = frozenset('0123456789+')
 
 
 def normalize_phone_number(value):
@@ -15,7 +18,7 @@ def normalize_phone_number(value):
     if value is None:
         return ''
     normalized = str(value).strip().translate(PERSIAN_DIGIT_TRANSLATION)
-    normalized = re.sub(r'[^0-9+]', '', normalized)
+    normalized = ''.join(ch for ch in normalized if ch in PHONE_NUMBER_CHARS)
     if normalized.startswith('00'):
         normalized = '+' + normalized[2:]
     if normalized.startswith('0') and len(normalized) == 11:
@@ -23,6 +26,103 @@ def normalize_phone_number(value):
     return normalized
 
 
+_http_connections = threading.local()
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+
+
+def _proxy_for(parts):
+    """Return the split ``HTTP(S)_PROXY`` URL for the target, as urllib would."""
+
+    proxy = urllib_request.getproxies().get(parts.scheme)
+    if not proxy or urllib_request.proxy_bypass(parts.hostname):
+        return None
+    proxy_parts = urllib_parse.urlsplit(proxy if '://' in proxy else f'http://{proxy}')
+    if proxy_parts.scheme != 'http' or not proxy_parts.hostname:
+        raise ValueError(f'Unsupported proxy URL: {proxy}')
+    return proxy_parts
+
+
+def _proxy_headers(proxy_parts):
+    if not proxy_parts.username:
+        return {}
+    credentials = (
+        f'{urllib_parse.unquote(proxy_parts.username)}:'
+        f'{urllib_parse.unquote(proxy_parts.password or "")}'
+    )
+    return {'Proxy-Authorization': 'Basic ' + base64.b64encode(credentials.encode()).decode('ascii')}
+
+
+def _open_connection(parts, proxy_parts, timeout):
+    if proxy_parts is None:
+        connection_class = (
+            http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        )
+        return connection_class(parts.hostname, parts.port, timeout=timeout)
+    proxy_port = proxy_parts.port or 80
+    if parts.scheme == 'https':
+        # CONNECT through the proxy; TLS is then negotiated with the target.
+        connection = http.client.HTTPSConnection(proxy_parts.hostname, proxy_port, timeout=timeout)
+        connection.set_tunnel(parts.hostname, parts.port, headers=_proxy_headers(proxy_parts))
+        return connection
+    return http.client.HTTPConnection(proxy_parts.hostname, proxy_port, timeout=timeout)
+
+
+def _post(url, body, headers, timeout):
+    """POST over a kept-alive connection owned by the calling thread.
+
+    Notification fan-out sends many small requests to the same provider, so
+    each thread reuses its TCP/TLS connection per host instead of paying a
+    new handshake for every message. ``HTTPS_PROXY``/``HTTP_PROXY`` and
+    ``NO_PROXY`` are honoured like urllib does. Returns ``(status, body_text)``.
+    """
+
+    parts = urllib_parse.urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise ValueError(f'Unsupported URL: {url}')
+    proxy_parts = _proxy_for(parts)
+    key = (parts.scheme, parts.hostname, parts.port, proxy_parts)
+    path = parts.path or '/'
+    if parts.query:
+        path = f'{path}?{parts.query}'
+    if proxy_parts is not None and parts.scheme == 'http':
+        # A plain-HTTP proxy takes the absolute URL and its own credentials.
+        path = url
+        headers = {**headers, **_proxy_headers(proxy_parts)}
+
+    pool = getattr(_http_connections, 'pool', None)
+    if pool is None:
+        pool = _http_connections.pool = {}
+
+    while True:
+        connection = pool.get(key)
+        reused = connection is not None
+        if connection is None:
+            connection = pool[key] = _open_connection(parts, proxy_parts, timeout)
+        connection.timeout = timeout
+        try:
+            connection.request('POST', path, body=body, headers=headers)
+            response = connection.getresponse()
+            payload = response.read().decode('utf-8')
+        except (http.client.HTTPException, OSError) as exc:
+            connection.close()
+            pool.pop(key, None)
+            # Only a kept-alive socket the server dropped while it sat idle is
+            # retried, on a fresh connection. Anything else, such as a read
+            # timeout, may come after the server acted on the request, and
+            # resending a notification would deliver it twice.
+            if reused and isinstance(exc, _STALE_CONNECTION_ERRORS):
+                continue
+            raise
+        if response.will_close:
+            connection.close()
+            pool.pop(key, None)
+        return response.status, payload
+
+
+class TelegramNotAccepted(ValueError):
+    """The message was refused or never reached the proxy, so it was not sent."""
+
+
 def send_telegram_message(chat_id: str, text: str):
     token = settings.TELEGRAM_BOT_TOKEN
     proxy_url = getattr(settings, 'TELEGRAM_WORKER_URL', '')
@@ -36,17 +136,22 @@ def send_telegram_message(chat_id: str, text: str):
         'chat_id': str(chat_id),
         'text': text,
     }).encode('utf-8')
-    req = urllib_request.Request(
-        proxy_url,
-        data=payload,
-        headers={'Content-Type': 'application/json'},
-    )
-
     try:
-        with urllib_request.urlopen(req, timeout=15) as response:
-            raw_body = response.read().decode('utf-8')
-    except (HTTPError, URLError) as exc:
+        status_code, raw_body = _post(
+            proxy_url,
+            payload,
+            {'Content-Type': 'application/json'},
+            timeout=15,
+        )
+    except (ConnectionRefusedError, socket.gaierror) as exc:
+        # Raised while connecting, before any of the request was written.
+        raise TelegramNotAccepted(f'Telegram proxy request failed: {exc}') from exc
+    except (http.client.HTTPException, OSError) as exc:
         raise ValueError(f'Telegram proxy request failed: {exc}') from exc
+    if status_code == 429:
+        raise TelegramNotAccepted('Telegram proxy request failed: HTTP Error 429')
+    if status_code >= 400:
+        raise ValueError(f'Telegram proxy request failed: HTTP Error {status_code}')
 
     try:
         body = json.loads(raw_body)
@@ -54,21 +159,30 @@ def send_telegram_message(chat_id: str, text: str):
         raise ValueError('Invalid response from telegram proxy.') from exc
 
     if not body.get('ok'):
-        raise ValueError(body.get('description', body.get('error', 'Failed to send telegram notification.')))
+        message = body.get('description', body.get('error', 'Failed to send telegram notification.'))
+        if body.get('error_code') == 429:
+            raise TelegramNotAccepted(message)
+        raise ValueError(message)
 
 
-def send_sms_message(phone_number: str, text: str):
+# Kavenegar accepts up to 200 comma-separated receptors per send request.
+SMS_BULK_MAX_RECEPTORS = 200
+# Per-message statuses Kavenegar reports for messages it will not deliver.
+SMS_FAILED_ENTRY_STATUSES = frozenset({6, 11, 13, 14, 100})
+
+
+class SMSNotAccepted(ValueError):
+    """The gateway answered but refused the request, so nothing was queued."""
+
+
+def _send_kavenegar_sms(receptor: str, text: str):
     api_key = getattr(settings, 'KAVENEGAR_API_KEY', '')
     if not api_key:
         raise ValueError('KAVENEGAR_API_KEY is not configured.')
 
-    normalized = normalize_phone_number(phone_number)
-    if not normalized:
-        raise ValueError('شماره موبایل نامعتبر است.')
-
     url = f'https://api.kavenegar.com/v1/{api_key}/sms/send.json'
     payload = {
-        'receptor': normalized,
+        'receptor': receptor,
         'message': text,
     }
     sender = getattr(settings, 'KAVENEGAR_SENDER', '')
@@ -76,12 +190,57 @@ def send_sms_message(phone_number: str, text: str):
         payload['sender'] = sender
 
     data = urllib_parse.urlencode(payload).encode()
-    req = urllib_request.Request(url, data=data, headers={'Content-Type': 'application/x-www-form-urlencoded'})
-    with urllib_request.urlopen(req, timeout=10) as response:
-        body = json.loads(response.read().decode('utf-8'))
+    status_code, raw_body = _post(
+        url,
+        data,
+        {'Content-Type': 'application/x-www-form-urlencoded'},
+        timeout=10,
+    )
+    if status_code >= 400:
+        raise SMSNotAccepted(f'SMS request failed: HTTP Error {status_code}')
+    body = json.loads(raw_body)
 
     status_code = body.get('return', {}).get('status')
     if status_code not in (200, 201):
-        raise ValueError(body.get('return', {}).get('message', 'Failed to send SMS notification.'))
+        raise SMSNotAccepted(body.get('return', {}).get('message', 'Failed to send SMS notification.'))
 
     return body
+
+
+def send_sms_message(phone_number: str, text: str):
+    if not getattr(settings, 'KAVENEGAR_API_KEY', ''):
+        raise ValueError('KAVENEGAR_API_KEY is not configured.')
+
+    normalized = normalize_phone_number(phone_number)
+    if not normalized:
+        raise ValueError('شماره موبایل نامعتبر است.')
+
+    return _send_kavenegar_sms(normalized, text)
+
+
+def send_sms_bulk(phone_numbers, text: str):
+    """Send the same text to several already-normalized numbers in one request.
+
+    Returns ``{phone_number: error}`` with an empty error for every receptor
+    the gateway queued. Kavenegar lists one entry per receptor in request
+    order, so entries are matched by position rather than by the receptor
+    string it echoes back in its own format.
+    """
+
+    phone_numbers = list(dict.fromkeys(phone_numbers))
+    if len(phone_numbers) > SMS_BULK_MAX_RECEPTORS:
+        raise ValueError(f'At most {SMS_BULK_MAX_RECEPTORS} receptors per SMS request.')
+    body = _send_kavenegar_sms(','.join(phone_numbers), text)
+
+    entries = body.get('entries') or []
+    results = {}
+    for index, phone_number in enumerate(phone_numbers):
+        if index >= len(entries):
+            results[phone_number] = 'No delivery entry returned for this receptor.'
+            continue
+        entry = entries[index]
+        if entry.get('status') in SMS_FAILED_ENTRY_STATUSES:
+            results[phone_number] = entry.get('statustext') or f"SMS status {entry.get('status')}"
+        else:
+            results[phone_number] = ''
+    return results
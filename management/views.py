@@ -1,30 +1,50 @@
 import csv
-import io
+import hashlib
+import heapq
 import json
 import re
+import time as time_module
 import zipfile
 from urllib.parse import unquote
-from collections import defaultdict
+from dataclasses import dataclass
 from datetime import datetime, time, timedelta, timezone as dt_timezone
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from operator import attrgetter
 
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.files.base import ContentFile
-from django.http import HttpResponse
-from django.db.models import Count, Max, Q
-from django.db.models.functions import Coalesce
+from django.core.cache import cache
+from django.core.files.base import File
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.db.models import Case, Count, F, IntegerField, Max, OuterRef, Q, Subquery, When
+from django.db.models.functions import Coalesce, Greatest, Least
 from django.utils import timezone
 from django.utils.dateparse import parse_date
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from accounts.models import Advisor, Profile, Student
 from xml.sax.saxutils import escape as xml_escape
 
-from management.utils import send_sms_message, send_telegram_message
+from management.renderers import ReportJSONRenderer, dumps_indented
+from management.cache import (
+    ADMIN_REPORT_CACHE_PREFIX,
+    ADMIN_REPORT_CACHE_TTL,
+    ADMIN_REPORT_CACHE_VERSION_KEY,
+    NOTIFICATION_TARGETS_CACHE_PREFIX,
+    NOTIFICATION_TARGETS_CACHE_TTL,
+    NOTIFICATION_TARGETS_CACHE_VERSION_KEY,
+    cache_version,
+)
+from management.tasks import enqueue_deliveries
 
 
 def parse_admin_report_filters(params):
@@ -58,66 +78,148 @@ def parse_admin_report_filters(params):
     return start_date, end_date, advisor_id
 
 
+def parse_chat_limit(params):
+    """Parse the optional cap on how many chat threads the report returns."""
+
+    raw = params.get('chat_limit')
+    if not raw:
+        return None
+    try:
+        limit = int(raw)
+    except (TypeError, ValueError):
+        raise ValueError('تعداد گفتگوها نامعتبر است.')
+    if limit < 1:
+        raise ValueError('تعداد گفتگوها نامعتبر است.')
+    return limit
+
+
+def chat_preview_text(text, file, voice):
+    """Return a short preview from a chat message's raw column values."""
+
+    if text:
+        return text
+    if file:
+        return '📎 فایل ضمیمه'
+    if voice:
+        return '🎤 پیام صوتی'
+    return ''
+
+
 def format_chat_preview(message):
     """Return a short preview for a chat message."""
 
     if not message:
         return ''
-    if getattr(message, 'text', None):
-        return message.text
-    if getattr(message, 'file', None):
-        return '📎 فایل ضمیمه'
-    if getattr(message, 'voice', None):
-        return '🎤 پیام صوتی'
-    return ''
+    return chat_preview_text(
+        getattr(message, 'text', None),
+        getattr(message, 'file', None),
+        getattr(message, 'voice', None),
+    )
 
 
-def combine_advisor_performance(session_counts, dropout_counts, non_renew_counts, chat_stats):
-    """Combine advisor aggregates into a single performance table."""
+def format_full_name(first_name, last_name, username=''):
+    """Mirror ``Profile.get_full_name`` for values() rows."""
+
+    return f"{first_name or ''} {last_name or ''}".strip() or (username or '')
+
+
+@dataclass(slots=True)
+class ChatThreadSummary:
+    """Per (advisor, student) chat aggregate collected for the admin report."""
+
+    advisor_id: int
+    student_user_id: int
+    last_message_at: datetime | None
+    last_message_preview: str
+    status: str
+    message_count: int
+    student_user: tuple | None  # (username, profile_id, role, full name)
+    # Conversations awaiting advisor responses first, newest activity at the
+    # top of each group.
+    sort_key: tuple
+
+
+# Columns the overdue / missing-plan session lists are built from; student and
+# advisor names are looked up by id instead of joining their profiles per row.
+SESSION_REPORT_FIELDS = (
+    'id',
+    'session_number',
+    'date',
+    'course_id',
+    'course__day_of_week',
+    'course__start_time',
+    'course__student_id',
+    'course__advisor_id',
+)
+
+
+def build_session_report_row(row, student_names, advisor_names):
+    """Shape a ``SESSION_REPORT_FIELDS`` values() row for the admin report."""
+
+    student_id = row['course__student_id']
+    advisor_id = row['course__advisor_id']
+    return {
+        'session_id': row['id'],
+        'course_id': row['course_id'],
+        'session_number': row['session_number'],
+        'date': row['date'].isoformat() if row['date'] else None,
+        'student': {
+            'id': student_id,
+            'name': student_names.get(student_id, ''),
+        },
+        'advisor': {
+            'id': advisor_id,
+            'name': advisor_names.get(advisor_id, ''),
+        },
+        'day_of_week': row['course__day_of_week'],
+        'start_time': row['course__start_time'].isoformat() if row['course__start_time'] else None,
+    }
 
-    advisor_map = {}
 
-    def ensure_record(payload):
-        advisor_id = payload.get('advisor_id')
-        if advisor_id is None:
-            return None
-        if advisor_id not in advisor_map:
-            advisor_map[advisor_id] = {
-                'advisor_id': advisor_id,
-                'advisor_name': payload.get('advisor_name', ''),
-                'sessions': 0,
-                'dropouts': 0,
-                'non_renewals': 0,
-                'answered_chats': 0,
-                'unanswered_chats': 0,
-            }
-        record = advisor_map[advisor_id]
-        if not record.get('advisor_name') and payload.get('advisor_name'):
-            record['advisor_name'] = payload['advisor_name']
-        return record
+def combine_advisor_performance(session_counts, dropout_counts, non_renew_counts, chat_stats):
+    """Combine advisor aggregates into a single performance table."""
 
-    for item in session_counts or []:
-        record = ensure_record(item)
-        if record is not None:
-            record['sessions'] = int(item.get('count') or 0)
+    def by_advisor(items):
+        return {
+            item['advisor_id']: item
+            for item in items or []
+            if item.get('advisor_id') is not None
+        }
 
-    for item in dropout_counts or []:
-        record = ensure_record(item)
-        if record is not None:
-            record['dropouts'] = int(item.get('count') or 0)
+    sessions = by_advisor(session_counts)
+    dropouts = by_advisor(dropout_counts)
+    non_renewals = by_advisor(non_renew_counts)
+    chats = by_advisor(chat_stats)
+    sources = (sessions, dropouts, non_renewals, chats)
+    # dict.fromkeys keeps advisors in first-seen order across the inputs.
+    advisor_ids = dict.fromkeys(
+        advisor_id for source in sources for advisor_id in source
+    )
 
-    for item in non_renew_counts or []:
-        record = ensure_record(item)
-        if record is not None:
-            record['non_renewals'] = int(item.get('count') or 0)
+    empty = {}
+    return [
+        {
+            'advisor_id': advisor_id,
+            'advisor_name': next(
+                (
+                    source[advisor_id]['advisor_name']
+                    for source in sources
+                    if source.get(advisor_id, empty).get('advisor_name')
+                ),
+                '',
+            ),
+            'sessions': int(sessions.get(advisor_id, empty).get('count') or 0),
+            'dropouts': int(dropouts.get(advisor_id, empty).get('count') or 0),
+            'non_renewals': int(non_renewals.get(advisor_id, empty).get('count') or 0),
+            'answered_chats': int(chats.get(advisor_id, empty).get('answered') or 0),
+            'unanswered_chats': int(chats.get(advisor_id, empty).get('unanswered') or 0),
+        }
+        for advisor_id in advisor_ids
+    ]
 
-    for item in chat_stats or []:
-        record = ensure_record(item)
-        if record is not None:
-            record['answered_chats'] = int(item.get('answered') or 0)
-            record['unanswered_chats'] = int(item.get('unanswered') or 0)
 
-    return list(advisor_map.values())
+_SHEET_NAME_INVALID = re.compile(r'[\\/*?\[\]:]')
+_EXPORT_FILENAME_INVALID = re.compile(r'[^A-Za-z0-9_-]')
 
 
 def sanitize_sheet_name(value, default='Sheet1'):
@@ -125,10 +227,18 @@ def sanitize_sheet_name(value, default='Sheet1'):
 
     if not value:
         value = default
-    cleaned = re.sub(r'[\\/*?\[\]:]', '', str(value))[:31]
+    cleaned = _SHEET_NAME_INVALID.sub('', str(value))[:31]
     return cleaned or default
 
 
+# Report columns repeat heavily (advisor names, dates, statuses), so recent
+# values are escaped once; the bound keeps columns of mostly unique values
+# (chat previews, phone numbers) from growing it with the export.
+@lru_cache(maxsize=4096)
+def _escape_cell_text(text):
+    return xml_escape(text)
+
+
 def column_name_from_index(index):
     """Convert a 1-based column index to an Excel column name."""
 
@@ -139,56 +249,23 @@ def column_name_from_index(index):
     return name or 'A'
 
 
-def generate_xlsx_bytes(sheet_name, headers, rows):
-    """Generate a simple XLSX workbook for the provided dataset."""
-
-    sheet = sanitize_sheet_name(sheet_name)
-    header_values = list(headers or [])
-
-    # Build worksheet XML using inline strings to avoid shared strings.
-    lines = [
-        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>',
-        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">',
-        '  <sheetData>',
-    ]
-
-    def render_row(row_index, values):
-        cells = []
-        for column_index, value in enumerate(values, start=1):
-            column_name = column_name_from_index(column_index)
-            text = '' if value is None else str(value)
-            cells.append(
-                f'    <c r="{column_name}{row_index}" t="inlineStr"><is><t>{xml_escape(text)}</t></is></c>'
-            )
-        cells_str = '\n'.join(cells)
-        return f'  <row r="{row_index}">\n{cells_str}\n  </row>'
-
-    lines.append(render_row(1, header_values))
-
-    for row_number, row in enumerate(rows or [], start=2):
-        ordered_values = [row.get(header, '') for header in header_values]
-        lines.append(render_row(row_number, ordered_values))
-
-    lines.extend(['  </sheetData>', '</worksheet>'])
-    worksheet_xml = '\n'.join(lines)
-
-    workbook_xml = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+XLSX_WORKBOOK_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
 <workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"
     xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
   <sheets>
     <sheet name="{sheet}" sheetId="1" r:id="rId1"/>
   </sheets>
 </workbook>
-""".format(sheet=xml_escape(sheet))
+"""
 
-    workbook_rels_xml = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+XLSX_WORKBOOK_RELS_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
 <Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
   <Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>
   <Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
 </Relationships>
 """
 
-    styles_xml = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+XLSX_STYLES_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
 <styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
   <fonts count="1">
     <font><sz val="11"/><name val="Calibri"/></font>
@@ -211,7 +288,7 @@ def generate_xlsx_bytes(sheet_name, headers, rows):
 </styleSheet>
 """
 
-    content_types_xml = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+XLSX_CONTENT_TYPES_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
 <Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
   <Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
   <Default Extension="xml" ContentType="application/xml"/>
@@ -221,30 +298,315 @@ def generate_xlsx_bytes(sheet_name, headers, rows):
 </Types>
 """
 
-    root_rels_xml = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+XLSX_ROOT_RELS_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
 <Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
   <Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
 </Relationships>
 """
 
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
-        archive.writestr('[Content_Types].xml', content_types_xml)
-        archive.writestr('_rels/.rels', root_rels_xml)
-        archive.writestr('xl/workbook.xml', workbook_xml)
-        archive.writestr('xl/_rels/workbook.xml.rels', workbook_rels_xml)
-        archive.writestr('xl/styles.xml', styles_xml)
-        archive.writestr('xl/worksheets/sheet1.xml', worksheet_xml)
+XLSX_STREAM_CHUNK_SIZE = 64 * 1024
 
-    return buffer.getvalue()
 
+class _ChunkSink:
+    """Write-only file object that hands zipped bytes back in chunks."""
 
-def collect_admin_report_data(range_start, range_end, advisor_id=None):
-    """Build the admin report payload and supporting metadata."""
+    def __init__(self):
+        self._chunks = []
+        self.size = 0
 
-    today = timezone.localdate()
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks, self.size = [], 0
+        return data
 
-    advisor_queryset = Advisor.objects.select_related('profile__user')
+
+def iter_xlsx_chunks(sheet_name, headers, rows, chunk_size=XLSX_STREAM_CHUNK_SIZE):
+    """Yield a simple XLSX workbook for the dataset as compressed byte chunks.
+
+    Rows are rendered and deflated one at a time straight into the zip stream,
+    so memory stays bounded by ``chunk_size`` rather than the worksheet size.
+    """
+
+    sheet = sanitize_sheet_name(sheet_name)
+    header_values = list(headers or [])
+
+    column_names = [
+        column_name_from_index(index) for index in range(1, len(header_values) + 1)
+    ]
+
+    def escape_value(value):
+        text = value if isinstance(value, str) else ('' if value is None else str(value))
+        return _escape_cell_text(text)
+
+    def render_row(row_index, values):
+        row_ref = str(row_index)
+        parts = ['<row r="', row_ref, '">']
+        for column_name, value in zip(column_names, values):
+            parts += (
+                '<c r="', column_name, row_ref, '" t="inlineStr"><is><t>',
+                escape_value(value),
+                '</t></is></c>',
+            )
+        parts.append('</row>')
+        return ''.join(parts)
+
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', XLSX_CONTENT_TYPES_XML)
+        archive.writestr('_rels/.rels', XLSX_ROOT_RELS_XML)
+        archive.writestr('xl/workbook.xml', XLSX_WORKBOOK_XML.format(sheet=xml_escape(sheet)))
+        archive.writestr('xl/_rels/workbook.xml.rels', XLSX_WORKBOOK_RELS_XML)
+        archive.writestr('xl/styles.xml', XLSX_STYLES_XML)
+
+        # Build worksheet XML using inline strings to avoid shared strings.
+        with archive.open('xl/worksheets/sheet1.xml', 'w') as worksheet:
+            worksheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">\n'
+                '  <sheetData>\n'
+            ).encode('utf-8'))
+            worksheet.write(render_row(1, header_values).encode('utf-8'))
+
+            for row_number, row in enumerate(rows or [], start=2):
+                ordered_values = map(row.get, header_values)
+                worksheet.write(render_row(row_number, ordered_values).encode('utf-8'))
+                if sink.size >= chunk_size:
+                    yield sink.drain()
+
+            worksheet.write('\n  </sheetData>\n</worksheet>'.encode('utf-8'))
+
+    yield sink.drain()
+
+
+def generate_xlsx_bytes(sheet_name, headers, rows):
+    """Generate a simple XLSX workbook for the provided dataset."""
+
+    return b''.join(iter_xlsx_chunks(sheet_name, headers, rows))
+
+
+class _EchoBuffer:
+    """Pseudo file whose ``write`` hands the written text straight back."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv_chunks(headers, rows):
+    """Yield a UTF-8 (with BOM) CSV export of the dataset line by line."""
+
+    header_values = list(headers or [])
+    writer = csv.writer(_EchoBuffer())
+    yield '\ufeff' + writer.writerow(header_values)
+    # Missing columns come back as None, which csv writes as an empty field.
+    for row in rows or []:
+        yield writer.writerow(map(row.get, header_values))
+
+
+def iter_report_archive(datasets, export_format, chunk_size=XLSX_STREAM_CHUNK_SIZE):
+    """Yield a zip of every report dataset as CSV or XLSX files."""
+
+    # XLSX members are zip containers that are already deflated, so they are
+    # stored as-is; only CSV members are worth compressing again.
+    compress_type = zipfile.ZIP_DEFLATED if export_format == 'csv' else zipfile.ZIP_STORED
+    date_time = time_module.localtime()[:6]
+
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for key, (headers, rows) in datasets.items():
+            member_info = zipfile.ZipInfo(f'{key}.{export_format}', date_time=date_time)
+            member_info.compress_type = compress_type
+            if export_format == 'csv':
+                pieces = (line.encode('utf-8') for line in iter_csv_chunks(headers, rows))
+            else:
+                pieces = iter_xlsx_chunks(key, headers, rows)
+            with archive.open(member_info, 'w') as member:
+                # Drain while the member is still being written so one large
+                # dataset never has to sit whole in the sink.
+                for piece in pieces:
+                    member.write(piece)
+                    if sink.size >= chunk_size:
+                        yield sink.drain()
+    yield sink.drain()
+
+
+def overdue_sessions_queryset(today, advisor_id=None):
+    """Sessions dated up to ``today`` that are still not ticked off."""
+
+    queryset = Session.objects.filter(is_completed=False).filter(date__lte=today)
+    if advisor_id:
+        queryset = queryset.filter(course__advisor_id=advisor_id)
+    return queryset
+
+
+def sessions_without_plan_queryset(range_start, range_end, advisor_id=None):
+    """Completed sessions in the range with no weekly plan uploaded."""
+
+    queryset = Session.objects.filter(is_completed=True).filter(
+        Q(plan_file__isnull=True) | Q(plan_file='')
+    )
+    if range_start:
+        queryset = queryset.filter(date__gte=range_start)
+    if range_end:
+        queryset = queryset.filter(date__lte=range_end)
+    if advisor_id:
+        queryset = queryset.filter(course__advisor_id=advisor_id)
+    return queryset
+
+
+def course_completions_queryset(range_start, range_end, advisor_id=None):
+    """Per-day counts of courses whose fourth session was completed."""
+
+    queryset = Session.objects.filter(is_completed=True, session_number=4)
+    if range_start:
+        queryset = queryset.filter(date__gte=range_start)
+    if range_end:
+        queryset = queryset.filter(date__lte=range_end)
+    if advisor_id:
+        queryset = queryset.filter(course__advisor_id=advisor_id)
+    return (
+        queryset.values('date')
+        .order_by('date')
+        .annotate(total=Count('course', distinct=True))
+    )
+
+
+SESSION_EXPORT_HEADERS = [
+    'session_id', 'course_id', 'session_number', 'student_id', 'student_name',
+    'advisor_id', 'advisor_name', 'date', 'day_of_week', 'start_time',
+]
+
+
+def iter_session_csv(queryset):
+    """Stream a session dataset as CSV straight from ``values_list`` rows."""
+
+    writer = csv.writer(_EchoBuffer())
+    yield '\ufeff' + writer.writerow(SESSION_EXPORT_HEADERS)
+    for (
+        session_id, course_id, session_number, session_date, day_of_week, start_time,
+        student_id, student_first, student_last, student_username,
+        advisor_id, advisor_first, advisor_last, advisor_username,
+    ) in queryset.values_list(
+        'id', 'course_id', 'session_number', 'date', 'course__day_of_week', 'course__start_time',
+        'course__student_id',
+        'course__student__profile__first_name',
+        'course__student__profile__last_name',
+        'course__student__profile__user__username',
+        'course__advisor_id',
+        'course__advisor__profile__first_name',
+        'course__advisor__profile__last_name',
+        'course__advisor__profile__user__username',
+    ).iterator(chunk_size=2000):
+        yield writer.writerow((
+            session_id,
+            course_id,
+            session_number,
+            student_id,
+            format_full_name(student_first, student_last, student_username),
+            advisor_id,
+            format_full_name(advisor_first, advisor_last, advisor_username),
+            session_date,
+            day_of_week,
+            start_time,
+        ))
+
+
+def iter_course_completions_csv(queryset):
+    writer = csv.writer(_EchoBuffer())
+    yield '\ufeff' + writer.writerow(['date', 'count'])
+    for entry in queryset.iterator(chunk_size=2000):
+        yield writer.writerow((entry['date'], entry['total']))
+
+
+# Report sections whose CSV export is written directly from their queryset
+# rather than from the assembled report payload.
+DIRECT_CSV_EXPORTS = {
+    'overdue_sessions': lambda start, end, advisor_id: iter_session_csv(
+        overdue_sessions_queryset(timezone.localdate(), advisor_id)
+    ),
+    'sessions_without_plan': lambda start, end, advisor_id: iter_session_csv(
+        sessions_without_plan_queryset(start, end, advisor_id)
+    ),
+    'course_completions_by_day': lambda start, end, advisor_id: iter_course_completions_csv(
+        course_completions_queryset(start, end, advisor_id)
+    ),
+}
+
+
+def course_end_date_expression():
+    """Date a course ended: its last session, falling back to its start date."""
+
+    return Coalesce(
+        Subquery(
+            Session.objects.filter(course_id=OuterRef('pk'))
+            .order_by('-date')
+            .values('date')[:1]
+        ),
+        F('start_date'),
+    )
+
+
+def run_report_queries(tasks):
+    """Run independent report query callables, concurrently when it is safe.
+
+    Each worker thread opens its own database connection once, reuses it for
+    every task it picks up and has it closed when the pool shuts down.
+    Inside an open transaction other connections cannot see its uncommitted
+    rows, so the tasks then run one after another on the calling thread.
+    """
+
+    workers = min(getattr(settings, 'ADMIN_REPORT_QUERY_WORKERS', 4), len(tasks))
+    if workers <= 1 or connection.in_atomic_block:
+        return {name: task() for name, task in tasks.items()}
+
+    worker_connections = []
+
+    def register_worker_connection():
+        # The pool's threads have exited by the time these are closed, so the
+        # calling thread is allowed to close them.
+        worker_connection = connections[DEFAULT_DB_ALIAS]
+        worker_connection.inc_thread_sharing()
+        worker_connections.append(worker_connection)
+
+    try:
+        with ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix='admin-report',
+            initializer=register_worker_connection,
+        ) as executor:
+            futures = {name: executor.submit(task) for name, task in tasks.items()}
+            return {name: future.result() for name, future in futures.items()}
+    finally:
+        for worker_connection in worker_connections:
+            worker_connection.close()
+            worker_connection.dec_thread_sharing()
+
+
+def collect_admin_report_data(range_start, range_end, advisor_id=None, chat_limit=None):
+    """Build the admin report payload and supporting metadata.
+
+    ``chat_limit`` keeps only the first N chat threads in report order.
+    """
+
+    tz = timezone.get_current_timezone()
+    now = timezone.now()
+    today = timezone.localdate(now, tz)
+
+    advisor_queryset = Advisor.objects.select_related('profile__user').only(
+        'id',
+        'profile__id',
+        'profile__first_name',
+        'profile__last_name',
+        'profile__user__id',
+        'profile__user__username',
+    )
     if advisor_id:
         advisor_queryset = advisor_queryset.filter(id=advisor_id)
     advisors = list(advisor_queryset)
@@ -265,105 +627,12 @@ def collect_admin_report_data(range_start, range_end, advisor_id=None):
     if range_start:
         start_dt = datetime.combine(range_start, time.min)
         if timezone.is_naive(start_dt):
-            start_dt = timezone.make_aware(start_dt, timezone.get_current_timezone())
+            start_dt = timezone.make_aware(start_dt, tz)
     if range_end:
         end_dt = datetime.combine(range_end, time.max)
         if timezone.is_naive(end_dt):
-            end_dt = timezone.make_aware(end_dt, timezone.get_current_timezone())
-
-    overdue_sessions_qs = (
-        Session.objects.select_related(
-            'course__student__profile__user',
-            'course__advisor__profile__user',
-        )
-        .filter(is_completed=False)
-        .filter(date__lte=today)
-    )
-    if advisor_id:
-        overdue_sessions_qs = overdue_sessions_qs.filter(course__advisor_id=advisor_id)
-
-    overdue_sessions = []
-    for session in overdue_sessions_qs:
-        course = session.course
-        student = getattr(course, 'student', None)
-        advisor = getattr(course, 'advisor', None)
-        student_profile = getattr(student, 'profile', None)
-        advisor_profile = getattr(advisor, 'profile', None)
-        overdue_sessions.append({
-            'session_id': session.id,
-            'course_id': course.id if course else None,
-            'session_number': session.session_number,
-            'date': session.date.isoformat() if session.date else None,
-            'student': {
-                'id': student.id if student else None,
-                'name': student_profile.get_full_name() if student_profile else '',
-            },
-            'advisor': {
-                'id': advisor.id if advisor else None,
-                'name': advisor_profile.get_full_name() if advisor_profile else '',
-            },
-            'day_of_week': course.day_of_week if course else None,
-            'start_time': course.start_time.isoformat() if course and course.start_time else None,
-        })
-
-    completion_sessions = Session.objects.filter(is_completed=True, session_number=4)
-    if range_start:
-        completion_sessions = completion_sessions.filter(date__gte=range_start)
-    if range_end:
-        completion_sessions = completion_sessions.filter(date__lte=range_end)
-    if advisor_id:
-        completion_sessions = completion_sessions.filter(course__advisor_id=advisor_id)
+            end_dt = timezone.make_aware(end_dt, tz)
 
-    course_completions_by_day = [
-        {
-            'date': entry['date'].isoformat() if entry['date'] else None,
-            'count': entry['total'],
-        }
-        for entry in (
-            completion_sessions.values('date')
-            .order_by('date')
-            .annotate(total=Count('course', distinct=True))
-        )
-    ]
-
-    sessions_without_plan_qs = Session.objects.filter(is_completed=True).filter(
-        Q(plan_file__isnull=True) | Q(plan_file='')
-    )
-    if range_start:
-        sessions_without_plan_qs = sessions_without_plan_qs.filter(date__gte=range_start)
-    if range_end:
-        sessions_without_plan_qs = sessions_without_plan_qs.filter(date__lte=range_end)
-    if advisor_id:
-        sessions_without_plan_qs = sessions_without_plan_qs.filter(course__advisor_id=advisor_id)
-
-    sessions_without_plan = []
-    for session in sessions_without_plan_qs.select_related(
-        'course__student__profile__user',
-        'course__advisor__profile__user',
-    ):
-        course = session.course
-        student = getattr(course, 'student', None)
-        advisor = getattr(course, 'advisor', None)
-        student_profile = getattr(student, 'profile', None)
-        advisor_profile = getattr(advisor, 'profile', None)
-        sessions_without_plan.append({
-            'session_id': session.id,
-            'course_id': course.id if course else None,
-            'session_number': session.session_number,
-            'date': session.date.isoformat() if session.date else None,
-            'student': {
-                'id': student.id if student else None,
-                'name': student_profile.get_full_name() if student_profile else '',
-            },
-            'advisor': {
-                'id': advisor.id if advisor else None,
-                'name': advisor_profile.get_full_name() if advisor_profile else '',
-            },
-            'day_of_week': course.day_of_week if course else None,
-            'start_time': course.start_time.isoformat() if course and course.start_time else None,
-        })
-
-    advisor_session_counts_map = {advisor.id: 0 for advisor in advisors}
     session_activity_qs = Session.objects.filter(is_completed=True)
     if range_start:
         session_activity_qs = session_activity_qs.filter(date__gte=range_start)
@@ -372,14 +641,6 @@ def collect_admin_report_data(range_start, range_end, advisor_id=None):
     if advisor_id:
         session_activity_qs = session_activity_qs.filter(course__advisor_id=advisor_id)
 
-    for entry in (
-        session_activity_qs.values('course__advisor_id')
-        .annotate(total=Count('id'))
-    ):
-        advisor_key = entry['course__advisor_id']
-        if advisor_key in advisor_session_counts_map:
-            advisor_session_counts_map[advisor_key] = entry['total']
-
     dropout_courses = Course.objects.filter(is_active=False)
     if advisor_id:
         dropout_courses = dropout_courses.filter(advisor_id=advisor_id)
@@ -395,76 +656,192 @@ def collect_admin_report_data(range_start, range_end, advisor_id=None):
     if range_end:
         dropout_courses = dropout_courses.filter(dropout_date__lte=range_end)
 
-    advisor_dropout_counts_map = {advisor.id: 0 for advisor in advisors}
-    for entry in (
-        dropout_courses.values('advisor_id')
-        .annotate(total=Count('student_id', distinct=True))
-    ):
-        advisor_key = entry['advisor_id']
-        if advisor_key in advisor_dropout_counts_map:
-            advisor_dropout_counts_map[advisor_key] = entry['total']
-
     students_base_qs = Student.objects.all()
     if advisor_id:
         students_base_qs = students_base_qs.filter(advisor_id=advisor_id)
 
-    students_for_mapping = list(
-        students_base_qs.select_related(
-            'profile__user',
-            'advisor__profile__user',
-            'grade',
-            'major',
-        )
+    # A student has not renewed when none of their courses is active; the
+    # course that ended last (final session, else start date) decides which
+    # advisor the non-renewal counts against.
+    latest_course_ids = (
+        Course.objects.filter(student_id=OuterRef('student_id'))
+        .annotate(end_date=course_end_date_expression())
+        .order_by('-end_date', 'id')
+        .values('id')[:1]
+    )
+    non_renewed_courses = (
+        Course.objects.filter(student_id__in=students_base_qs.values('id'))
+        .exclude(student_id__in=Course.objects.filter(is_active=True).values('student_id'))
+        .annotate(end_date=course_end_date_expression())
+        .filter(pk=Subquery(latest_course_ids))
     )
+    if range_start:
+        non_renewed_courses = non_renewed_courses.filter(end_date__gte=range_start)
+    if range_end:
+        non_renewed_courses = non_renewed_courses.filter(end_date__lte=range_end)
 
-    student_ids = [student.id for student in students_for_mapping]
+    # Group the chat log per (advisor user, student user) thread in SQL; only
+    # the last message of each thread and the student users are loaded.
+    advisor_user_ids = list(advisor_user_map.keys())
+    chat_qs = ChatMessage.objects.all()
+    if start_dt:
+        chat_qs = chat_qs.filter(timestamp__gte=start_dt)
+    if end_dt:
+        chat_qs = chat_qs.filter(timestamp__lte=end_dt)
+    if advisor_user_ids:
+        chat_qs = chat_qs.filter(
+            Q(sender_id__in=advisor_user_ids, receiver__profile__role='student') |
+            (
+                ~Q(sender_id__in=advisor_user_ids) &
+                Q(receiver_id__in=advisor_user_ids, sender__profile__role='student')
+            )
+        )
+    else:
+        chat_qs = chat_qs.none()
 
-    student_by_user_id = {
-        student.profile.user_id: student
-        for student in students_for_mapping
-        if getattr(student, 'profile', None) and student.profile.user_id
+    def fetch_chat_threads():
+        sent_by_advisor = Q(sender_id__in=advisor_user_ids)
+        thread_rows = list(
+            chat_qs.values(
+                advisor_user_id=Case(
+                    When(sent_by_advisor, then=F('sender_id')),
+                    default=F('receiver_id'),
+                    output_field=IntegerField(),
+                ),
+                student_user_id=Case(
+                    When(sent_by_advisor, then=F('receiver_id')),
+                    default=F('sender_id'),
+                    output_field=IntegerField(),
+                ),
+            )
+            .annotate(
+                message_count=Count('id'),
+                last_message_at=Max('timestamp'),
+                last_message_id=Max('id'),
+            )
+            .order_by()
+        )
+        last_messages = {
+            message_id: (sender_id, chat_preview_text(text, file, voice))
+            for message_id, sender_id, text, file, voice in ChatMessage.objects.filter(
+                pk__in=[row['last_message_id'] for row in thread_rows]
+            ).values_list('id', 'sender_id', 'text', 'file', 'voice')
+        }
+        student_users = {
+            user_id: (username, profile_id, role, format_full_name(first_name, last_name))
+            for user_id, username, profile_id, role, first_name, last_name in User.objects.filter(
+                pk__in={row['student_user_id'] for row in thread_rows}
+            ).values_list(
+                'id',
+                'username',
+                'profile__id',
+                'profile__role',
+                'profile__first_name',
+                'profile__last_name',
+            )
+        }
+        return thread_rows, last_messages, student_users
+
+    # The sections below are independent of each other, so their queries can
+    # run concurrently; results are shaped afterwards on this thread.
+    results = run_report_queries({
+        'overdue_rows': lambda: list(
+            overdue_sessions_queryset(today, advisor_id)
+            .values(*SESSION_REPORT_FIELDS).iterator(chunk_size=1000)
+        ),
+        'planless_rows': lambda: list(
+            sessions_without_plan_queryset(range_start, range_end, advisor_id)
+            .values(*SESSION_REPORT_FIELDS).iterator(chunk_size=1000)
+        ),
+        'completions': lambda: list(
+            course_completions_queryset(range_start, range_end, advisor_id)
+        ),
+        'session_counts': lambda: dict(
+            session_activity_qs.values_list('course__advisor_id')
+            .annotate(total=Count('id'))
+        ),
+        'dropout_counts': lambda: dict(
+            dropout_courses.values_list('advisor_id')
+            .annotate(total=Count('student_id', distinct=True))
+        ),
+        'non_renewal_counts': lambda: dict(
+            non_renewed_courses.values_list('advisor_id')
+            .annotate(total=Count('id'))
+            .order_by()
+        ),
+        'students': lambda: list(
+            students_base_qs.values_list(
+                'id',
+                'profile_id',
+                'profile__user_id',
+                'profile__first_name',
+                'profile__last_name',
+                'profile__user__username',
+            ).iterator(chunk_size=1000)
+        ),
+        'by_advisor': lambda: list(
+            students_base_qs.values('advisor_id')
+            .annotate(total=Count('id'))
+            .order_by('advisor_id')
+        ),
+        'by_grade': lambda: list(
+            students_base_qs.values('grade_id', 'grade__name')
+            .annotate(total=Count('id'))
+            .order_by('grade__name')
+        ),
+        'by_major': lambda: list(
+            students_base_qs.values('major_id', 'major__name')
+            .annotate(total=Count('id'))
+            .order_by('major__name')
+        ),
+        'chat': fetch_chat_threads,
+    })
+
+    overdue_rows = results['overdue_rows']
+    planless_rows = results['planless_rows']
+    session_student_names = {
+        student_id: format_full_name(first_name, last_name, username)
+        for student_id, first_name, last_name, username in Student.objects.filter(
+            id__in={row['course__student_id'] for row in overdue_rows + planless_rows}
+        ).values_list(
+            'id',
+            'profile__first_name',
+            'profile__last_name',
+            'profile__user__username',
+        )
     }
+    overdue_sessions = [
+        build_session_report_row(row, session_student_names, advisor_name_map)
+        for row in overdue_rows
+    ]
+    sessions_without_plan = [
+        build_session_report_row(row, session_student_names, advisor_name_map)
+        for row in planless_rows
+    ]
 
-    courses_for_students = (
-        Course.objects.filter(student_id__in=student_ids)
-        .select_related('advisor__profile__user', 'student__profile__user')
-        .prefetch_related('sessions')
-    )
-
-    student_course_map = defaultdict(list)
-    for course in courses_for_students:
-        student_course_map[course.student_id].append(course)
+    course_completions_by_day = [
+        {
+            'date': entry['date'].isoformat() if entry['date'] else None,
+            'count': entry['total'],
+        }
+        for entry in results['completions']
+    ]
 
-    def course_end_date(course_obj):
-        session_dates = [s.date for s in course_obj.sessions.all() if s.date]
-        if session_dates:
-            return max(session_dates)
-        if course_obj.start_date:
-            return course_obj.start_date
-        return None
+    # Advisors with no matching rows are filled with zero when the per-advisor
+    # lists are emitted below.
+    advisor_session_counts_map = results['session_counts']
+    advisor_dropout_counts_map = results['dropout_counts']
+    advisor_non_renew_map = results['non_renewal_counts']
 
-    advisor_non_renew_map = {advisor.id: 0 for advisor in advisors}
-    for course_list in student_course_map.values():
-        if any(course.is_active for course in course_list):
-            continue
-        last_course = None
-        last_date = None
-        for course in course_list:
-            end_date_candidate = course_end_date(course)
-            if not end_date_candidate:
-                continue
-            if not last_date or end_date_candidate > last_date:
-                last_date = end_date_candidate
-                last_course = course
-        if not last_course or not last_date:
-            continue
-        if range_start and last_date < range_start:
-            continue
-        if range_end and last_date > range_end:
-            continue
-        advisor_key = getattr(last_course, 'advisor_id', None)
-        if advisor_key in advisor_non_renew_map:
-            advisor_non_renew_map[advisor_key] += 1
+    student_by_user_id = {
+        user_id: {
+            'id': student_id,
+            'profile_id': profile_id,
+            'name': format_full_name(first_name, last_name, username),
+        }
+        for student_id, profile_id, user_id, first_name, last_name, username in results['students']
+        if user_id
+    }
 
     distribution_by_advisor = [
         {
@@ -472,11 +849,7 @@ def collect_admin_report_data(range_start, range_end, advisor_id=None):
             'advisor_name': advisor_name_map.get(entry['advisor_id'], 'نامشخص') if entry['advisor_id'] else 'نامشخص',
             'count': entry['total'],
         }
-        for entry in (
-            students_base_qs.values('advisor_id')
-            .annotate(total=Count('id'))
-            .order_by('advisor_id')
-        )
+        for entry in results['by_advisor']
     ]
 
     distribution_by_grade = [
@@ -485,11 +858,7 @@ def collect_admin_report_data(range_start, range_end, advisor_id=None):
             'grade_name': entry['grade__name'] or 'نامشخص',
             'count': entry['total'],
         }
-        for entry in (
-            students_base_qs.values('grade_id', 'grade__name')
-            .annotate(total=Count('id'))
-            .order_by('grade__name')
-        )
+        for entry in results['by_grade']
     ]
 
     distribution_by_major = [
@@ -498,80 +867,42 @@ def collect_admin_report_data(range_start, range_end, advisor_id=None):
             'major_name': entry['major__name'] or 'نامشخص',
             'count': entry['total'],
         }
-        for entry in (
-            students_base_qs.values('major_id', 'major__name')
-            .annotate(total=Count('id'))
-            .order_by('major__name')
-        )
+        for entry in results['by_major']
     ]
 
-    conversations = defaultdict(lambda: {'messages': [], 'student': None})
-    chat_student_user_ids = set()
-    chat_qs = ChatMessage.objects.select_related(
-        'sender__profile__user', 'receiver__profile__user'
-    )
-    if start_dt:
-        chat_qs = chat_qs.filter(timestamp__gte=start_dt)
-    if end_dt:
-        chat_qs = chat_qs.filter(timestamp__lte=end_dt)
-    if advisor_user_map:
-        chat_qs = chat_qs.filter(
-            Q(sender_id__in=advisor_user_map.keys()) |
-            Q(receiver_id__in=advisor_user_map.keys())
-        )
-    else:
-        chat_qs = chat_qs.none()
-
-    for message in chat_qs:
-        advisor_key = None
-        other_user = None
-        if message.sender_id in advisor_user_map:
-            advisor_key = advisor_user_map[message.sender_id]
-            other_user = message.receiver
-        elif message.receiver_id in advisor_user_map:
-            advisor_key = advisor_user_map[message.receiver_id]
-            other_user = message.sender
-        if not advisor_key or advisor_key not in advisor_name_map:
-            continue
-        other_profile = getattr(other_user, 'profile', None)
-        if not other_profile or getattr(other_profile, 'role', None) != 'student':
-            continue
-        other_user_id = getattr(other_user, 'id', None)
-        if not other_user_id:
-            continue
-        conversation = conversations[(advisor_key, other_user_id)]
-        conversation['messages'].append(message)
-        if conversation['student'] is None and other_user:
-            conversation['student'] = other_user
-        chat_student_user_ids.add(other_user_id)
+    thread_rows, last_messages, chat_student_users = results['chat']
 
     advisor_chat_stats_map = {
         advisor.id: {'answered': 0, 'unanswered': 0}
         for advisor in advisors
     }
     raw_chat_threads = []
-    for (advisor_key, student_user_id), payload in conversations.items():
-        messages = payload['messages']
-        if not messages:
+    for row in thread_rows:
+        advisor_key = advisor_user_map.get(row['advisor_user_id'])
+        last_message = last_messages.get(row['last_message_id'])
+        if not advisor_key or last_message is None:
             continue
-        ordered = sorted(messages, key=lambda item: item.timestamp or timezone.now())
-        last_message = ordered[-1]
-        status = 'answered' if last_message.sender_id in advisor_user_map else 'pending'
+        last_sender_id, last_message_preview = last_message
+        status = 'answered' if last_sender_id in advisor_user_map else 'pending'
         stats = advisor_chat_stats_map.get(advisor_key)
         if stats is not None:
             if status == 'answered':
                 stats['answered'] += 1
             else:
                 stats['unanswered'] += 1
-        raw_chat_threads.append({
-            'advisor_id': advisor_key,
-            'student_user_id': student_user_id,
-            'last_message_at': last_message.timestamp,
-            'last_message_preview': format_chat_preview(last_message),
-            'status': status,
-            'message_count': len(ordered),
-            'student_user': payload.get('student'),
-        })
+        raw_chat_threads.append(ChatThreadSummary(
+            advisor_id=advisor_key,
+            student_user_id=row['student_user_id'],
+            last_message_at=row['last_message_at'],
+            last_message_preview=last_message_preview,
+            status=status,
+            message_count=row['message_count'],
+            student_user=chat_student_users.get(row['student_user_id']),
+            sort_key=(
+                0 if status == 'pending' else 1,
+                -(row['last_message_at'] or now).timestamp(),
+            ),
+        ))
 
     advisor_session_counts = [
         {
@@ -611,36 +942,32 @@ def collect_admin_report_data(range_start, range_end, advisor_id=None):
     ]
 
     chat_threads = []
-    # Sort so that conversations awaiting advisor responses appear first,
-    # with the newest activity at the top of each group.
-    def sort_key(entry):
-        status_rank = 0 if entry.get('status') == 'pending' else 1
-        last_at = entry.get('last_message_at') or timezone.now()
-        return (status_rank, -last_at.timestamp())
-
-    for item in sorted(raw_chat_threads, key=sort_key):
-        advisor_key = item['advisor_id']
-        student_user_id = item['student_user_id']
-        student_obj = item.get('student_user')
-        student_profile = getattr(student_obj, 'profile', None)
+    sort_key = attrgetter('sort_key')
+    if chat_limit is None:
+        ordered_chat_threads = sorted(raw_chat_threads, key=sort_key)
+    else:
+        ordered_chat_threads = heapq.nsmallest(chat_limit, raw_chat_threads, key=sort_key)
+
+    for item in ordered_chat_threads:
+        advisor_key = item.advisor_id
+        student_user_id = item.student_user_id
+        student_user = item.student_user
         student_model = student_by_user_id.get(student_user_id)
         student_name = ''
         student_id = None
         student_profile_id = None
-        if student_profile and getattr(student_profile, 'role', None) == 'student':
-            student_name = student_profile.get_full_name() or student_obj.get_username()
-            student_profile_id = getattr(student_profile, 'id', None)
+        if student_user:
+            username, profile_id, role, full_name = student_user
+            if profile_id and role == 'student':
+                student_name = full_name or username
+                student_profile_id = profile_id
         if student_model:
-            student_id = student_model.id
+            student_id = student_model['id']
             if not student_name:
-                model_profile = getattr(student_model, 'profile', None)
-                if model_profile:
-                    student_name = model_profile.get_full_name() or (
-                        model_profile.user.get_username() if getattr(model_profile, 'user', None) else ''
-                    )
-                    student_profile_id = getattr(model_profile, 'id', None)
-        if not student_name and student_obj:
-            student_name = student_obj.get_username() or f'کاربر {student_user_id}'
+                student_name = student_model['name']
+                student_profile_id = student_model['profile_id']
+        if not student_name and student_user:
+            student_name = student_user[0] or f'کاربر {student_user_id}'
         chat_threads.append({
             'advisor_id': advisor_key,
             'advisor_name': advisor_name_map.get(advisor_key, ''),
@@ -648,11 +975,11 @@ def collect_admin_report_data(range_start, range_end, advisor_id=None):
             'student_id': student_id,
             'student_profile_id': student_profile_id,
             'student_name': student_name,
-            'status': item['status'],
-            'last_message': item['last_message_preview'],
-            'last_message_at': item['last_message_at'].isoformat() if item['last_message_at'] else None,
-            'message_count': item['message_count'],
-            'last_sender_role': 'advisor' if item['status'] == 'answered' else 'student',
+            'status': item.status,
+            'last_message': item.last_message_preview,
+            'last_message_at': item.last_message_at.isoformat() if item.last_message_at else None,
+            'message_count': item.message_count,
+            'last_sender_role': 'advisor' if item.status == 'answered' else 'student',
         })
 
     student_distribution = {
@@ -698,47 +1025,59 @@ def collect_admin_report_data(range_start, range_end, advisor_id=None):
     return payload, extras
 
 
-def build_report_datasets(report_data):
-    """Convert the report payload into tabular datasets."""
-
-    data = report_data or {}
-    datasets = {}
+def get_admin_report_data(range_start, range_end, advisor_id=None, chat_limit=None):
+    """Return the admin report payload, reusing a recent build for the same filters."""
 
-    overdue_rows = []
-    for item in data.get('overdue_sessions') or []:
-        student = item.get('student') or {}
-        advisor = item.get('advisor') or {}
-        overdue_rows.append({
-            'session_id': item.get('session_id'),
-            'course_id': item.get('course_id'),
-            'session_number': item.get('session_number'),
-            'student_id': student.get('id'),
-            'student_name': student.get('name'),
-            'advisor_id': advisor.get('id'),
-            'advisor_name': advisor.get('name'),
-            'date': item.get('date'),
-            'day_of_week': item.get('day_of_week'),
-            'start_time': item.get('start_time'),
-        })
-    datasets['overdue_sessions'] = (
-        ['session_id', 'course_id', 'session_number', 'student_id', 'student_name', 'advisor_id', 'advisor_name', 'date', 'day_of_week', 'start_time'],
-        overdue_rows,
+    cache_key = (
+        f'{ADMIN_REPORT_CACHE_PREFIX}{cache_version(ADMIN_REPORT_CACHE_VERSION_KEY)}:'
+        f'{range_start}:{range_end}:{advisor_id}:{chat_limit}'
     )
-
-    completion_rows = [
-        {
-            'date': item.get('date'),
-            'count': item.get('count'),
-        }
-        for item in data.get('course_completions_by_day') or []
-    ]
-    datasets['course_completions_by_day'] = (['date', 'count'], completion_rows)
-
-    without_plan_rows = []
-    for item in data.get('sessions_without_plan') or []:
+    report_data = cache.get(cache_key)
+    if report_data is None:
+        report_data, _ = collect_admin_report_data(
+            range_start, range_end, advisor_id, chat_limit=chat_limit
+        )
+        cache.set(cache_key, report_data, ADMIN_REPORT_CACHE_TTL)
+    return report_data
+
+
+SESSION_DATASET_HEADERS = (
+    'session_id', 'course_id', 'session_number', 'student_id', 'student_name',
+    'advisor_id', 'advisor_name', 'date', 'day_of_week', 'start_time',
+)
+
+# Report sections whose rows are already flat dicts keyed by the export
+# columns; the CSV/XLSX writers pick the headers out of each row themselves.
+FLAT_REPORT_DATASETS = {
+    'advisor_session_counts': ('advisor_id', 'advisor_name', 'count'),
+    'advisor_dropout_counts': ('advisor_id', 'advisor_name', 'count'),
+    'advisor_non_renewal_counts': ('advisor_id', 'advisor_name', 'count'),
+    'advisor_chat_stats': ('advisor_id', 'advisor_name', 'answered', 'unanswered'),
+    'advisor_performance': (
+        'advisor_id', 'advisor_name', 'sessions', 'dropouts', 'non_renewals',
+        'answered_chats', 'unanswered_chats',
+    ),
+    'chat_threads': (
+        'advisor_id', 'advisor_name', 'student_id', 'student_user_id', 'student_name',
+        'status', 'last_sender_role', 'last_message', 'last_message_at', 'message_count',
+    ),
+}
+
+STUDENT_DISTRIBUTION_DATASETS = {
+    'by_advisor': ('student_distribution_by_advisor', ('advisor_id', 'advisor_name', 'count')),
+    'by_grade': ('student_distribution_by_grade', ('grade_id', 'grade_name', 'count')),
+    'by_major': ('student_distribution_by_major', ('major_id', 'major_name', 'count')),
+}
+
+
+def flatten_session_report_rows(items):
+    """Inline the nested student/advisor of session report rows."""
+
+    rows = []
+    for item in items or []:
         student = item.get('student') or {}
         advisor = item.get('advisor') or {}
-        without_plan_rows.append({
+        rows.append({
             'session_id': item.get('session_id'),
             'course_id': item.get('course_id'),
             'session_number': item.get('session_number'),
@@ -750,131 +1089,33 @@ def build_report_datasets(report_data):
             'day_of_week': item.get('day_of_week'),
             'start_time': item.get('start_time'),
         })
-    datasets['sessions_without_plan'] = (
-        ['session_id', 'course_id', 'session_number', 'student_id', 'student_name', 'advisor_id', 'advisor_name', 'date', 'day_of_week', 'start_time'],
-        without_plan_rows,
-    )
-
-    datasets['advisor_session_counts'] = (
-        ['advisor_id', 'advisor_name', 'count'],
-        [
-            {
-                'advisor_id': item.get('advisor_id'),
-                'advisor_name': item.get('advisor_name'),
-                'count': item.get('count'),
-            }
-            for item in data.get('advisor_session_counts') or []
-        ],
-    )
-
-    datasets['advisor_dropout_counts'] = (
-        ['advisor_id', 'advisor_name', 'count'],
-        [
-            {
-                'advisor_id': item.get('advisor_id'),
-                'advisor_name': item.get('advisor_name'),
-                'count': item.get('count'),
-            }
-            for item in data.get('advisor_dropout_counts') or []
-        ],
-    )
+    return rows
 
-    datasets['advisor_non_renewal_counts'] = (
-        ['advisor_id', 'advisor_name', 'count'],
-        [
-            {
-                'advisor_id': item.get('advisor_id'),
-                'advisor_name': item.get('advisor_name'),
-                'count': item.get('count'),
-            }
-            for item in data.get('advisor_non_renewal_counts') or []
-        ],
-    )
 
-    datasets['advisor_chat_stats'] = (
-        ['advisor_id', 'advisor_name', 'answered', 'unanswered'],
-        [
-            {
-                'advisor_id': item.get('advisor_id'),
-                'advisor_name': item.get('advisor_name'),
-                'answered': item.get('answered'),
-                'unanswered': item.get('unanswered'),
-            }
-            for item in data.get('advisor_chat_stats') or []
-        ],
-    )
-
-    datasets['advisor_performance'] = (
-        ['advisor_id', 'advisor_name', 'sessions', 'dropouts', 'non_renewals', 'answered_chats', 'unanswered_chats'],
-        [
-            {
-                'advisor_id': item.get('advisor_id'),
-                'advisor_name': item.get('advisor_name'),
-                'sessions': item.get('sessions'),
-                'dropouts': item.get('dropouts'),
-                'non_renewals': item.get('non_renewals'),
-                'answered_chats': item.get('answered_chats'),
-                'unanswered_chats': item.get('unanswered_chats'),
-            }
-            for item in data.get('advisor_performance') or []
-        ],
-    )
+def build_report_datasets(report_data):
+    """Convert the report payload into tabular datasets."""
 
-    datasets['chat_threads'] = (
-        ['advisor_id', 'advisor_name', 'student_id', 'student_user_id', 'student_name', 'status', 'last_sender_role', 'last_message', 'last_message_at', 'message_count'],
-        [
-            {
-                'advisor_id': item.get('advisor_id'),
-                'advisor_name': item.get('advisor_name'),
-                'student_id': item.get('student_id'),
-                'student_user_id': item.get('student_user_id'),
-                'student_name': item.get('student_name'),
-                'status': item.get('status'),
-                'last_sender_role': item.get('last_sender_role'),
-                'last_message': item.get('last_message'),
-                'last_message_at': item.get('last_message_at'),
-                'message_count': item.get('message_count'),
-            }
-            for item in data.get('chat_threads') or []
-        ],
-    )
+    data = report_data or {}
+    datasets = {
+        'overdue_sessions': (
+            SESSION_DATASET_HEADERS,
+            flatten_session_report_rows(data.get('overdue_sessions')),
+        ),
+        'course_completions_by_day': (
+            ('date', 'count'),
+            data.get('course_completions_by_day') or [],
+        ),
+        'sessions_without_plan': (
+            SESSION_DATASET_HEADERS,
+            flatten_session_report_rows(data.get('sessions_without_plan')),
+        ),
+    }
+    for key, headers in FLAT_REPORT_DATASETS.items():
+        datasets[key] = (headers, data.get(key) or [])
 
     student_distribution = data.get('student_distribution') or {}
-    datasets['student_distribution_by_advisor'] = (
-        ['advisor_id', 'advisor_name', 'count'],
-        [
-            {
-                'advisor_id': item.get('advisor_id'),
-                'advisor_name': item.get('advisor_name'),
-                'count': item.get('count'),
-            }
-            for item in student_distribution.get('by_advisor') or []
-        ],
-    )
-
-    datasets['student_distribution_by_grade'] = (
-        ['grade_id', 'grade_name', 'count'],
-        [
-            {
-                'grade_id': item.get('grade_id'),
-                'grade_name': item.get('grade_name'),
-                'count': item.get('count'),
-            }
-            for item in student_distribution.get('by_grade') or []
-        ],
-    )
-
-    datasets['student_distribution_by_major'] = (
-        ['major_id', 'major_name', 'count'],
-        [
-            {
-                'major_id': item.get('major_id'),
-                'major_name': item.get('major_name'),
-                'count': item.get('count'),
-            }
-            for item in student_distribution.get('by_major') or []
-        ],
-    )
+    for group, (key, headers) in STUDENT_DISTRIBUTION_DATASETS.items():
+        datasets[key] = (headers, student_distribution.get(group) or [])
 
     return datasets
 
@@ -890,13 +1131,12 @@ def build_export_filename(prefix, extension, range_start=None, range_end=None, a
     if advisor_id:
         parts.append(f'advisor-{advisor_id}')
     name = '_'.join(parts)
-    name = re.sub(r'[^A-Za-z0-9_-]', '-', name)
+    name = _EXPORT_FILENAME_INVALID.sub('-', name)
     return f'{name}.{extension}'
 from plans.models import Course, Session
 from .models import ChatMessage, Notification, NotificationRecipient, Payment
 from .serializers import (AdvisorOptionSerializer, ChatMessageSerializer,
-                          NotificationRecipientSerializer,
-                          NotificationTargetSerializer, PaymentSerializer,
+                          NotificationRecipientSerializer, PaymentSerializer,
                           UserProfileSerializer)
 
 class IsAdminOrReadOnly(permissions.BasePermission):
@@ -914,6 +1154,9 @@ class PaymentViewSet(viewsets.ModelViewSet):
     """
     serializer_class = PaymentSerializer
     permission_classes = [permissions.IsAdminUser]
+    # The approve/reject actions filter by pk directly, so only numeric ids
+    # may reach them; anything else is a 404 from the URL resolver.
+    lookup_value_regex = r'\d+'
 
     def get_queryset(self):
         return (
@@ -923,20 +1166,21 @@ class PaymentViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['post'], url_path='approve')
     def approve_payment(self, request, pk=None):
-        payment = self.get_object()
-        payment.status = 'approved'
-        payment.save()
+        updated = Payment.objects.filter(pk=pk).update(status='approved')
+        if not updated:
+            return Response({'detail': 'پرداخت یافت نشد.'}, status=status.HTTP_404_NOT_FOUND)
         # You can add logic here to activate the student's course
         return Response({'status': 'Payment approved'}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'], url_path='reject')
     def reject_payment(self, request, pk=None):
-        payment = self.get_object()
-        payment.status = 'rejected'
+        changes = {'status': 'rejected'}
         notes = request.data.get('notes')
         if notes:
-            payment.admin_notes = notes
-        payment.save()
+            changes['admin_notes'] = notes
+        updated = Payment.objects.filter(pk=pk).update(**changes)
+        if not updated:
+            return Response({'detail': 'پرداخت یافت نشد.'}, status=status.HTTP_404_NOT_FOUND)
         return Response({'status': 'Payment rejected'}, status=status.HTTP_200_OK)
 
 
@@ -997,14 +1241,18 @@ class AdminReportSummaryView(APIView):
     """
 
     permission_classes = [permissions.IsAdminUser]
+    renderer_classes = [ReportJSONRenderer, BrowsableAPIRenderer]
 
     def get(self, request):
         try:
             range_start, range_end, advisor_id = parse_admin_report_filters(request.query_params)
+            chat_limit = parse_chat_limit(request.query_params)
         except ValueError as exc:
             return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-        report_data, _ = collect_admin_report_data(range_start, range_end, advisor_id)
+        report_data = get_admin_report_data(
+            range_start, range_end, advisor_id, chat_limit=chat_limit
+        )
         return Response(report_data)
 
 
@@ -1013,6 +1261,7 @@ class AdminReportExportView(APIView):
     """Downloadable exports for admin reports."""
 
     permission_classes = [permissions.IsAdminUser]
+    renderer_classes = [ReportJSONRenderer, BrowsableAPIRenderer]
 
     def get(self, request):
         try:
@@ -1020,12 +1269,21 @@ class AdminReportExportView(APIView):
         except ValueError as exc:
             return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-        report_data, _ = collect_admin_report_data(range_start, range_end, advisor_id)
-        datasets = build_report_datasets(report_data)
-
         section = (request.query_params.get('section') or 'all').strip().lower()
         export_format = (request.query_params.get('format') or 'csv').strip().lower()
 
+        if export_format == 'csv' and section in DIRECT_CSV_EXPORTS:
+            filename = build_export_filename(section, 'csv', range_start, range_end, advisor_id)
+            response = StreamingHttpResponse(
+                DIRECT_CSV_EXPORTS[section](range_start, range_end, advisor_id),
+                content_type='text/csv; charset=utf-8',
+            )
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+            return response
+
+        report_data = get_admin_report_data(range_start, range_end, advisor_id)
+        datasets = build_report_datasets(report_data)
+
         if section != 'all' and section not in datasets:
             return Response({'detail': 'بخش گزارش یافت نشد.'}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -1038,42 +1296,29 @@ class AdminReportExportView(APIView):
             if not datasets:
                 return Response({'detail': 'داده‌ای برای خروجی وجود ندارد.'}, status=status.HTTP_400_BAD_REQUEST)
 
-            buffer = io.BytesIO()
-            with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
-                for key, (headers, rows) in datasets.items():
-                    if export_format == 'csv':
-                        csv_buffer = io.StringIO()
-                        writer = csv.DictWriter(csv_buffer, fieldnames=headers)
-                        writer.writeheader()
-                        for row in rows:
-                            writer.writerow({header: row.get(header, '') for header in headers})
-                        archive.writestr(f'{key}.csv', '\ufeff' + csv_buffer.getvalue())
-                    else:
-                        archive.writestr(f'{key}.xlsx', generate_xlsx_bytes(key, headers, rows))
-
             filename = build_export_filename('reports', 'zip', range_start, range_end, advisor_id)
-            response = HttpResponse(buffer.getvalue(), content_type='application/zip')
+            response = StreamingHttpResponse(
+                iter_report_archive(datasets, export_format),
+                content_type='application/zip',
+            )
             response['Content-Disposition'] = f'attachment; filename="{filename}"'
             return response
 
         headers, rows = datasets.get(section, ([], []))
 
         if export_format == 'csv':
-            csv_buffer = io.StringIO()
-            writer = csv.DictWriter(csv_buffer, fieldnames=headers)
-            writer.writeheader()
-            for row in rows:
-                writer.writerow({header: row.get(header, '') for header in headers})
             filename = build_export_filename(section, 'csv', range_start, range_end, advisor_id)
-            response = HttpResponse('\ufeff' + csv_buffer.getvalue(), content_type='text/csv; charset=utf-8')
+            response = StreamingHttpResponse(
+                iter_csv_chunks(headers, rows),
+                content_type='text/csv; charset=utf-8',
+            )
             response['Content-Disposition'] = f'attachment; filename="{filename}"'
             return response
 
         if export_format == 'xlsx':
-            data = generate_xlsx_bytes(section, headers, rows)
             filename = build_export_filename(section, 'xlsx', range_start, range_end, advisor_id)
-            response = HttpResponse(
-                data,
+            response = StreamingHttpResponse(
+                iter_xlsx_chunks(section, headers, rows),
                 content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
             )
             response['Content-Disposition'] = f'attachment; filename="{filename}"'
@@ -1081,7 +1326,9 @@ class AdminReportExportView(APIView):
 
         if export_format == 'json':
             filename = build_export_filename(section, 'json', range_start, range_end, advisor_id)
-            payload = json.dumps(rows, ensure_ascii=False, indent=2)
+            # Flat sections are passed through from the report payload, so
+            # narrow them to the export columns like the CSV/XLSX writers do.
+            payload = dumps_indented([dict(zip(headers, map(row.get, headers))) for row in rows])
             response = HttpResponse(payload, content_type='application/json; charset=utf-8')
             response['Content-Disposition'] = f'attachment; filename="{filename}"'
             return response
@@ -1100,21 +1347,10 @@ class ConversationListView(APIView):
         user = request.user
         profile = getattr(user, 'profile', None)
 
-        def serialize_user(user_obj):
-            if not user_obj:
-                return None
-            cached = serialized_users.get(user_obj.id)
-            if cached:
-                return cached
-
+        def serialize_user(user_obj, profile_data):
             profile_obj = getattr(user_obj, 'profile', None)
-            profile_data = None
             full_name_parts = []
             if profile_obj:
-                profile_data = UserProfileSerializer(
-                    profile_obj,
-                    context={'request': request},
-                ).data
                 first_name = getattr(profile_obj, 'first_name', '') or ''
                 last_name = getattr(profile_obj, 'last_name', '') or ''
                 if first_name:
@@ -1134,13 +1370,11 @@ class ConversationListView(APIView):
             }
             if profile_obj:
                 payload['role'] = getattr(profile_obj, 'role', None)
-            serialized_users[user_obj.id] = payload
             return payload
 
         def format_preview(message):
             return format_chat_preview(message)
 
-        serialized_users = {}
         allowed_user_ids = set()
         if profile:
             if profile.role == 'student':
@@ -1178,35 +1412,64 @@ class ConversationListView(APIView):
                     User.objects.exclude(id=user.id).values_list('id', flat=True)
                 )
 
-        base_messages = ChatMessage.objects.select_related(
-            'sender__profile', 'receiver__profile'
-        )
-        direct_messages = base_messages.filter(
-            Q(sender=user) | Q(receiver=user)
-        )
-
-        conversation_meta = {}
-        for msg in direct_messages:
-            other_user = msg.receiver if msg.sender_id == user.id else msg.sender
-            other_user_id = getattr(other_user, 'id', None)
-            if not other_user_id:
-                continue
-
-            meta = conversation_meta.setdefault(
-                other_user_id,
-                {
-                    'last_message': '',
-                    'last_message_at': None,
-                    'unread_count': 0,
-                },
+        # Let the database fold the message history into one row per peer (and
+        # per pair for admins); only the newest message of each is loaded.
+        direct_rows = []
+        pair_rows = []
+        if profile and profile.role == 'admin':
+            # Admins see every conversation, so one pass grouped by the
+            # unordered pair covers both their own chats and everyone else's.
+            for row in (
+                ChatMessage.objects.annotate(
+                    low=Least('sender_id', 'receiver_id'),
+                    high=Greatest('sender_id', 'receiver_id'),
+                )
+                .order_by()
+                .values('low', 'high')
+                .annotate(
+                    last_message_at=Max('timestamp'),
+                    last_message_id=Max('id'),
+                    unread_count=Count('id', filter=Q(receiver=user, is_read=False)),
+                )
+            ):
+                low, high = row['low'], row['high']
+                if user.id in (low, high):
+                    row['peer'] = high if low == user.id else low
+                    direct_rows.append(row)
+                elif low != high:
+                    pair_rows.append(row)
+        else:
+            direct_rows = list(
+                ChatMessage.objects.filter(Q(sender=user) | Q(receiver=user))
+                .annotate(
+                    peer=Case(
+                        When(sender=user, then=F('receiver_id')),
+                        default=F('sender_id'),
+                        output_field=IntegerField(),
+                    )
+                )
+                .order_by()
+                .values('peer')
+                .annotate(
+                    last_message_at=Max('timestamp'),
+                    last_message_id=Max('id'),
+                    unread_count=Count('id', filter=Q(receiver=user, is_read=False)),
+                )
             )
 
-            if not meta['last_message_at'] or msg.timestamp > meta['last_message_at']:
-                meta['last_message'] = format_preview(msg)
-                meta['last_message_at'] = msg.timestamp
+        last_message_ids = [row['last_message_id'] for row in direct_rows + pair_rows]
+        previews = {
+            msg.id: format_preview(msg)
+            for msg in ChatMessage.objects.filter(id__in=last_message_ids).only('id', 'text', 'file', 'voice')
+        } if last_message_ids else {}
 
-            if msg.receiver_id == user.id and not msg.is_read:
-                meta['unread_count'] += 1
+        conversation_meta = {}
+        for row in direct_rows:
+            conversation_meta[row['peer']] = {
+                'last_message': previews.get(row['last_message_id'], ''),
+                'last_message_at': row['last_message_at'],
+                'unread_count': row['unread_count'],
+            }
 
         for allowed_id in allowed_user_ids:
             conversation_meta.setdefault(
@@ -1220,32 +1483,13 @@ class ConversationListView(APIView):
 
         pair_meta = {}
         pair_user_ids = set()
-        if profile and profile.role == 'admin':
-            other_messages = base_messages.exclude(
-                Q(sender=user) | Q(receiver=user)
-            )
-            for msg in other_messages:
-                sender_id = msg.sender_id
-                receiver_id = msg.receiver_id
-                if not sender_id or not receiver_id or sender_id == receiver_id:
-                    continue
-                participants = tuple(sorted((sender_id, receiver_id)))
-                if user.id in participants:
-                    continue
-
-                meta = pair_meta.setdefault(
-                    participants,
-                    {
-                        'last_message': '',
-                        'last_message_at': None,
-                    },
-                )
-
-                if not meta['last_message_at'] or msg.timestamp > meta['last_message_at']:
-                    meta['last_message'] = format_preview(msg)
-                    meta['last_message_at'] = msg.timestamp
-
-                pair_user_ids.update(participants)
+        for row in pair_rows:
+            participants = (row['low'], row['high'])
+            pair_meta[participants] = {
+                'last_message': previews.get(row['last_message_id'], ''),
+                'last_message_at': row['last_message_at'],
+            }
+            pair_user_ids.update(participants)
 
         user_ids_needed = set(conversation_meta.keys()) | pair_user_ids | {user.id}
         if not user_ids_needed:
@@ -1255,16 +1499,35 @@ class ConversationListView(APIView):
             u.id: u
             for u in User.objects.filter(id__in=user_ids_needed).select_related('profile')
         }
+        users_map.setdefault(user.id, user)
+
+        # Serialize every participant's profile in one pass, then build each
+        # user payload once up front so the entry loops are plain lookups.
+        profiles = [
+            profile_obj
+            for profile_obj in (getattr(u, 'profile', None) for u in users_map.values())
+            if profile_obj
+        ]
+        profile_data_map = {
+            profile_obj.user_id: data
+            for profile_obj, data in zip(
+                profiles,
+                UserProfileSerializer(profiles, many=True, context={'request': request}).data,
+            )
+        }
+        serialized_users = {
+            user_id: serialize_user(user_obj, profile_data_map.get(user_id))
+            for user_id, user_obj in users_map.items()
+        }
 
         fallback_sort = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
-        current_user_payload = serialize_user(user)
+        current_user_payload = serialized_users[user.id]
 
         entries = []
         for user_id, meta in conversation_meta.items():
-            other_user = users_map.get(user_id)
-            if not other_user:
+            other_payload = serialized_users.get(user_id)
+            if not other_payload:
                 continue
-            other_payload = serialize_user(other_user)
             last_at = meta.get('last_message_at') or fallback_sort
             entry = {
                 'id': f'user:{user_id}',
@@ -1280,12 +1543,8 @@ class ConversationListView(APIView):
 
         for participants, meta in pair_meta.items():
             first_id, second_id = participants
-            first_user = users_map.get(first_id)
-            second_user = users_map.get(second_id)
-            if not first_user or not second_user:
-                continue
-            first_payload = serialize_user(first_user)
-            second_payload = serialize_user(second_user)
+            first_payload = serialized_users.get(first_id)
+            second_payload = serialized_users.get(second_id)
             if not first_payload or not second_payload:
                 continue
             display_name = (
@@ -1315,11 +1574,28 @@ class ConversationListView(APIView):
         return Response(entries)
 
 
+class ChatMessageCursorPagination(CursorPagination):
+    """Newest-first cursor pages; each page is returned oldest-first for display."""
+
+    ordering = ('-timestamp', '-id')
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': list(reversed(data)),
+        })
+
+
 class MessageListView(APIView):
     """
     View برای نمایش پیام‌های یک گفتگوی خاص و ارسال پیام جدید.
     """
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ChatMessageCursorPagination
 
     @staticmethod
     def _is_admin_user(user):
@@ -1345,7 +1621,8 @@ class MessageListView(APIView):
                 raise ValueError('invalid conversation id')
             if target_id == request.user.id:
                 raise ValueError('invalid conversation id')
-            other_user = User.objects.get(id=target_id)
+            # Only the id is needed to filter and to attach new messages.
+            other_user = User.objects.only('id').get(id=target_id)
             return {
                 'type': 'direct',
                 'other_user': other_user,
@@ -1366,8 +1643,10 @@ class MessageListView(APIView):
             if first == second:
                 raise ValueError('invalid conversation id')
             ordered = tuple(sorted((first, second)))
-            user_a = User.objects.get(id=ordered[0])
-            user_b = User.objects.get(id=ordered[1])
+            users = {user.id: user for user in User.objects.only('id').filter(id__in=ordered)}
+            if len(users) != 2:
+                raise User.DoesNotExist
+            user_a, user_b = users[ordered[0]], users[ordered[1]]
             return {
                 'type': 'pair',
                 'user_ids': ordered,
@@ -1389,15 +1668,25 @@ class MessageListView(APIView):
 
         if conversation['type'] == 'direct':
             other_user = conversation['other_user']
+            # Mark the incoming side read before the thread is fetched so the
+            # response already reflects it. The (receiver, is_read) index makes
+            # this a cheap probe that writes nothing when the chat is caught up.
+            ChatMessage.objects.filter(
+                sender=other_user, receiver=request.user, is_read=False,
+            ).update(is_read=True)
             messages = ChatMessage.objects.filter(
                 (Q(sender=request.user) & Q(receiver=other_user))
                 | (Q(sender=other_user) & Q(receiver=request.user))
             ).order_by('timestamp')
-            messages.filter(receiver=request.user, is_read=False).update(is_read=True)
         else:
             user_a_id, user_b_id = conversation['user_ids']
             participant_ids = {user_a_id, user_b_id}
             admin_id = request.user.id
+            # The pair thread also shows what either participant sent the
+            # admin, so those count as read here too.
+            ChatMessage.objects.filter(
+                sender_id__in=participant_ids, receiver_id=admin_id, is_read=False,
+            ).update(is_read=True)
             messages = ChatMessage.objects.filter(
                 (Q(sender_id=user_a_id, receiver_id=user_b_id)
                  | Q(sender_id=user_b_id, receiver_id=user_a_id)
@@ -1405,12 +1694,18 @@ class MessageListView(APIView):
                  | Q(sender_id__in=participant_ids, receiver_id=admin_id))
             ).order_by('timestamp')
 
+        # Only the requested page is loaded; older history is reached through
+        # the ``next`` cursor.
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(
+            messages.select_related('sender__profile'), request, view=self
+        )
         serializer = ChatMessageSerializer(
-            messages,
+            page,
             many=True,
             context={'request': request},
         )
-        return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request, conversation_id):
         try:
@@ -1446,23 +1741,8 @@ class MessageListView(APIView):
         file_obj = validated.get('file')
         voice_obj = validated.get('voice')
 
-        file_content = file_name = None
-        if file_obj:
-            try:
-                file_obj.seek(0)
-            except Exception:  # noqa: BLE001
-                pass
-            file_content = file_obj.read()
-            file_name = getattr(file_obj, 'name', 'attachment')
-
-        voice_content = voice_name = None
-        if voice_obj:
-            try:
-                voice_obj.seek(0)
-            except Exception:  # noqa: BLE001
-                pass
-            voice_content = voice_obj.read()
-            voice_name = getattr(voice_obj, 'name', 'voice-message.webm')
+        file_name = getattr(file_obj, 'name', None) or 'attachment'
+        voice_name = getattr(voice_obj, 'name', None) or 'voice-message.webm'
 
         target_value = request.data.get('target') or request.data.get('target_user_id')
         participant_ids = set(conversation['user_ids'])
@@ -1483,10 +1763,13 @@ class MessageListView(APIView):
             message_kwargs = {}
             if text:
                 message_kwargs['text'] = text
-            if file_content is not None:
-                message_kwargs['file'] = ContentFile(file_content, name=file_name)
-            if voice_content is not None:
-                message_kwargs['voice'] = ContentFile(voice_content, name=voice_name)
+            # Wrapping the upload in a fresh File per recipient makes storage
+            # copy it chunk by chunk (from disk for large uploads) instead of
+            # moving the temporary file away or holding its bytes in memory.
+            if file_obj:
+                message_kwargs['file'] = File(file_obj, name=file_name)
+            if voice_obj:
+                message_kwargs['voice'] = File(voice_obj, name=voice_name)
 
             message = ChatMessage.objects.create(
                 sender=request.user,
@@ -1575,38 +1858,63 @@ class PaymentSubmissionView(APIView):
         )
 
 
+# Columns PaymentSerializer reads, including the student name it shows.
+PAYMENT_STATUS_FIELDS = (
+    'id',
+    'student',
+    'course',
+    'amount',
+    'reference_number',
+    'payment_date',
+    'status',
+    'created_at',
+    'admin_notes',
+    'student__profile',
+    'student__profile__first_name',
+    'student__profile__last_name',
+    'student__profile__user',
+    'student__profile__user__username',
+)
+
+
+class PaymentLimitOffsetPagination(LimitOffsetPagination):
+    """Opt-in paging: without ``?limit=`` the full list is returned as before."""
+
+    max_limit = 500
+
+
 class PaymentStatusView(APIView):
     """نمایش وضعیت پرداخت‌ها برای کاربر جاری."""
 
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = PaymentLimitOffsetPagination
 
     def get(self, request):
+        payments = Payment.objects.select_related('student__profile__user').only(
+            *PAYMENT_STATUS_FIELDS
+        )
         if request.user.is_staff:
-            payments = (
-                Payment.objects.select_related('student__profile')
-                .order_by('-created_at')
-            )
+            payments = payments.order_by('-created_at')
         else:
             profile = getattr(request.user, 'profile', None)
             if not profile or profile.role != 'student':
                 return Response([], status=status.HTTP_200_OK)
 
-            student = (
-                Student.objects.select_related('profile')
-                .filter(profile=profile)
-                .first()
-            )
-            if not student:
-                return Response([], status=status.HTTP_200_OK)
-
-            payments = (
-                Payment.objects.select_related('student__profile')
-                .filter(student=student)
-                .order_by('-created_at')
-            )
+            payments = payments.filter(student__profile=profile).order_by('-created_at')
 
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(payments, request, view=self)
+        if page is not None:
+            serializer = PaymentSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
         serializer = PaymentSerializer(payments, many=True)
         return Response(serializer.data)
+
+
+# Channels a notification may be sent through; anything else is rejected.
+NOTIFICATION_CHANNELS = frozenset({'panel', 'telegram', 'sms'})
+
+
 class NotificationSendView(APIView):
     """ارسال اعلان برای لیست انتخاب شده از دانش‌آموزان و مشاوران."""
 
@@ -1627,11 +1935,14 @@ class NotificationSendView(APIView):
         raw_channels = data.get('channels') or []
         if isinstance(raw_channels, str):
             raw_channels = [raw_channels]
-        channels = [str(channel).strip().lower() for channel in raw_channels if str(channel).strip()]
-        valid_channels = {'panel', 'telegram', 'sms'}
+        channels = set()
+        for channel in raw_channels:
+            channel = str(channel).strip().lower()
+            if channel:
+                channels.add(channel)
         if not channels:
             return Response({'detail': 'حداقل یک کانال ارسال باید انتخاب شود.'}, status=status.HTTP_400_BAD_REQUEST)
-        if not set(channels).issubset(valid_channels):
+        if not channels <= NOTIFICATION_CHANNELS:
             return Response({'detail': 'کانال ارسال نامعتبر است.'}, status=status.HTTP_400_BAD_REQUEST)
 
         recipient_ids = data.get('recipient_ids') or data.get('user_ids') or []
@@ -1640,32 +1951,46 @@ class NotificationSendView(APIView):
         if not recipient_ids:
             student_ids = data.get('student_ids') or []
             advisor_ids = data.get('advisor_ids') or []
+            user_id_querysets = []
             if student_ids:
-                recipient_ids.extend(
+                user_id_querysets.append(
                     Student.objects.filter(id__in=student_ids)
                     .values_list('profile__user_id', flat=True)
                 )
             if advisor_ids:
-                recipient_ids.extend(
+                user_id_querysets.append(
                     Advisor.objects.filter(id__in=advisor_ids)
                     .values_list('profile__user_id', flat=True)
                 )
+            if user_id_querysets:
+                # One round trip for both selections; UNION also drops users
+                # picked as both a student and an advisor.
+                recipient_ids.extend(user_id_querysets[0].union(*user_id_querysets[1:]))
 
-        cleaned_ids = []
+        # Parse and de-duplicate in one pass, keeping the first-seen order.
+        unique_ids = {}
         for value in recipient_ids:
             try:
-                cleaned_ids.append(int(value))
+                unique_ids[int(value)] = None
             except (TypeError, ValueError):
                 continue
-        unique_ids = list(dict.fromkeys(cleaned_ids))
+        unique_ids = list(unique_ids)
         if not unique_ids:
             return Response({'detail': 'حداقل یک مخاطب باید انتخاب شود.'}, status=status.HTTP_400_BAD_REQUEST)
 
+        # Only the columns the fan-out needs; users without a profile come
+        # back with None for the profile fields.
         users = list(
-            User.objects.filter(id__in=unique_ids)
-            .select_related('profile')
+            User.objects.filter(id__in=unique_ids).values_list(
+                'id',
+                'username',
+                'profile__first_name',
+                'profile__last_name',
+                'profile__telegram_chat_id',
+                'profile__phone_number',
+            )
         )
-        found_user_ids = {user.id for user in users}
+        found_user_ids = {user[0] for user in users}
         missing_ids = sorted(set(unique_ids) - found_user_ids)
         if missing_ids:
             return Response(
@@ -1673,77 +1998,44 @@ class NotificationSendView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        if not users:
-            return Response({'detail': 'هیچ کاربری برای ارسال اعلان یافت نشد.'}, status=status.HTTP_400_BAD_REQUEST)
-
         send_via_panel = 'panel' in channels
         send_via_telegram = 'telegram' in channels
         send_via_sms = 'sms' in channels
 
-        notification = Notification.objects.create(
-            sender=request.user if request.user.is_authenticated else None,
-            message=message,
-            send_via_panel=send_via_panel,
-            send_via_telegram=send_via_telegram,
-            send_via_sms=send_via_sms,
-        )
-
         recipient_records = []
         results = []
+        pending_deliveries = []
+        queued_at = timezone.now()
 
-        for user in users:
-            try:
-                profile = user.profile
-            except Profile.DoesNotExist:
-                profile = None
-
-            full_name = profile.get_full_name() if profile else user.get_username()
-            telegram_success = False
-            sms_success = False
+        for user_id, username, first_name, last_name, chat_id, phone_number in users:
+            full_name = format_full_name(first_name, last_name, username)
             telegram_error = ''
             sms_error = ''
+            queued_channels = []
 
             if send_via_telegram:
-                chat_id = getattr(profile, 'telegram_chat_id', None) if profile else None
                 if chat_id:
-                    try:
-                        send_telegram_message(chat_id, message)
-                        telegram_success = True
-                    except Exception as exc:  # noqa: BLE001
-                        telegram_error = str(exc)
+                    queued_channels.append('telegram')
+                    pending_deliveries.append(('telegram', user_id, chat_id))
                 else:
                     telegram_error = 'شناسه تلگرام ثبت نشده است.'
 
             if send_via_sms:
-                phone_number = getattr(profile, 'phone_number', None) if profile else None
                 if phone_number:
-                    try:
-                        send_sms_message(phone_number, message)
-                        sms_success = True
-                    except Exception as exc:  # noqa: BLE001
-                        sms_error = str(exc)
+                    queued_channels.append('sms')
+                    pending_deliveries.append(('sms', user_id, phone_number))
                 else:
                     sms_error = 'شماره موبایل در پروفایل موجود نیست.'
 
             recipient_records.append(
                 NotificationRecipient(
-                    notification=notification,
-                    user=user,
-                    telegram_sent=telegram_success,
-                    sms_sent=sms_success,
+                    user_id=user_id,
                     telegram_error=telegram_error or None,
                     sms_error=sms_error or None,
+                    delivery_claimed_at=queued_at if queued_channels else None,
                 )
             )
 
-            sent_channels = []
-            if send_via_panel:
-                sent_channels.append('panel')
-            if telegram_success:
-                sent_channels.append('telegram')
-            if sms_success:
-                sent_channels.append('sms')
-
             failed_channels = []
             if telegram_error:
                 failed_channels.append({'channel': 'telegram', 'reason': telegram_error})
@@ -1752,14 +2044,43 @@ class NotificationSendView(APIView):
 
             results.append(
                 {
-                    'user_id': user.id,
+                    'user_id': user_id,
                     'name': full_name,
-                    'sent_channels': sent_channels,
+                    'sent_channels': ['panel'] if send_via_panel else [],
+                    'queued_channels': queued_channels,
                     'failed_channels': failed_channels,
                 }
             )
 
-        NotificationRecipient.objects.bulk_create(recipient_records)
+        with transaction.atomic():
+            notification = Notification.objects.create(
+                sender=request.user if request.user.is_authenticated else None,
+                message=message,
+                send_via_panel=send_via_panel,
+                send_via_telegram=send_via_telegram,
+                send_via_sms=send_via_sms,
+            )
+            for record in recipient_records:
+                record.notification = notification
+            # Chunked multi-row INSERTs; the (notification, user) unique index
+            # makes a duplicated recipient a no-op instead of an IntegrityError.
+            NotificationRecipient.objects.bulk_create(
+                recipient_records,
+                batch_size=getattr(settings, 'NOTIFICATION_BULK_BATCH_SIZE', 500),
+                ignore_conflicts=True,
+            )
+            if pending_deliveries:
+                # bulk_create does not return primary keys on every backend.
+                recipient_ids = dict(
+                    NotificationRecipient.objects.filter(notification=notification)
+                    .values_list('user_id', 'id')
+                )
+                # Telegram and SMS calls run off the request thread once the
+                # rows they report into are committed.
+                enqueue_deliveries(
+                    (channel, recipient_ids[user_id], destination, message)
+                    for channel, user_id, destination in pending_deliveries
+                )
 
         return Response(
             {
@@ -1770,19 +2091,34 @@ class NotificationSendView(APIView):
         )
 
 
+PROFILE_ROLE_LABELS = dict(Profile.ROLE_CHOICES)
+
+
 class NotificationRecipientListView(APIView):
     """بازگرداندن فهرست کاربران قابل انتخاب برای اعلان."""
 
     permission_classes = [permissions.IsAdminUser]
 
     def get(self, request):
+        search_query = (request.query_params.get('q') or '').strip()
+        cache_key = (
+            f'{NOTIFICATION_TARGETS_CACHE_PREFIX}'
+            f'{cache_version(NOTIFICATION_TARGETS_CACHE_VERSION_KEY)}:'
+            f'{hashlib.md5(search_query.encode("utf-8"), usedforsecurity=False).hexdigest()}'
+        )
+        targets = cache.get(cache_key)
+        if targets is None:
+            targets = self.build_targets(search_query)
+            cache.set(cache_key, targets, NOTIFICATION_TARGETS_CACHE_TTL)
+        return Response(targets)
+
+    @staticmethod
+    def build_targets(search_query):
         queryset = (
             Profile.objects.filter(role__in=['student', 'advisor'])
-            .select_related('user')
             .order_by('role', 'first_name', 'last_name', 'user__username')
         )
 
-        search_query = (request.query_params.get('q') or '').strip()
         if search_query:
             queryset = queryset.filter(
                 Q(first_name__icontains=search_query)
@@ -1791,8 +2127,52 @@ class NotificationRecipientListView(APIView):
                 | Q(phone_number__icontains=search_query)
             )
 
-        serializer = NotificationTargetSerializer(queryset, many=True)
-        return Response(serializer.data)
+        # The picker can list every student and advisor, so rows are read as
+        # plain tuples and mapped directly rather than built into models.
+        rows = queryset.values_list(
+            'user_id',
+            'first_name',
+            'last_name',
+            'user__username',
+            'role',
+            'phone_number',
+            'telegram_chat_id',
+            'student__id',
+            'advisor__id',
+        )
+        targets = []
+        for (user_id, first_name, last_name, username, role, phone_number,
+             telegram_chat_id, student_id, advisor_id) in rows:
+            targets.append({
+                'user_id': user_id,
+                'full_name': f"{first_name or ''} {last_name or ''}".strip() or username,
+                'role': role,
+                'role_display': PROFILE_ROLE_LABELS.get(role, role),
+                'phone_number': phone_number,
+                'telegram_chat_id': telegram_chat_id,
+                'student_id': student_id,
+                'advisor_id': advisor_id,
+            })
+        return targets
+
+
+# Columns NotificationRecipientSerializer reads, so the inbox join does not
+# drag in the recipient user or the sender's password hash and profile blobs.
+NOTIFICATION_INBOX_FIELDS = (
+    'id',
+    'notification_id',
+    'is_read',
+    'telegram_sent',
+    'sms_sent',
+    'telegram_error',
+    'sms_error',
+    'notification__message',
+    'notification__created_at',
+    'notification__sender__username',
+    'notification__sender__profile__user',
+    'notification__sender__profile__first_name',
+    'notification__sender__profile__last_name',
+)
 
 
 class NotificationInboxView(APIView):
@@ -1806,6 +2186,12 @@ class NotificationInboxView(APIView):
                 'notification__sender__profile',
                 'notification__sender',
             )
+            .only(*NOTIFICATION_INBOX_FIELDS)
+            .annotate(
+                ch_panel=F('notification__send_via_panel'),
+                ch_tg=F('notification__send_via_telegram'),
+                ch_sms=F('notification__send_via_sms'),
+            )
             .filter(user=request.user, notification__send_via_panel=True)
             .order_by('-notification__created_at', '-created_at')
         )
@@ -1840,9 +2226,19 @@ class NotificationMarkReadView(APIView):
         if not cleaned_ids:
             return Response({'updated': 0}, status=status.HTTP_200_OK)
 
-        updated = NotificationRecipient.objects.filter(
-            user=request.user,
-            id__in=cleaned_ids,
-        ).update(is_read=True)
-
-        return Response({'updated': updated}, status=status.HTTP_200_OK)
+        # 'updated' keeps counting every matched notification, but only the
+        # unread ones are written, so repeated marks issue no UPDATE.
+        matched = dict(
+            NotificationRecipient.objects.filter(
+                user=request.user,
+                id__in=cleaned_ids,
+            ).values_list('id', 'is_read')
+        )
+        unread_ids = [pk for pk, is_read in matched.items() if not is_read]
+        if unread_ids:
+            NotificationRecipient.objects.filter(
+                id__in=unread_ids,
+                is_read=False,
+            ).update(is_read=True)
+
+        return Response({'updated': len(matched)}, status=status.HTTP_200_OK)
@@ -4,16 +4,12 @@ from django.contrib.auth.decorators import login_required
 from django.http import HttpResponseBadRequest, JsonResponse
 from django.shortcuts import render
 
-from accounts.models import Advisor, Grade, Profile, Student
+from accounts.models import MAJOR_CODES, Advisor, Grade, Profile, Student
 from plans.default_plan_data import DEFAULT_BOXES
 from plans.models import Box, DefaultEvent, Lesson, WeeklyReportDetail
 
 
-MAJOR_TO_CODE = {
-    "تجربی": "T",
-    "ریاضی": "R",
-    "انسانی": "E",
-}
+MAJOR_TO_CODE = MAJOR_CODES
 MAJOR_SUBJECTS = {
     "تجربی": ["زیست", "ریاضی", "شیمی", "فیزیک", "زمین"],
     "ریاضی": ["حسابان", "ریاضی", "آمار", "شیمی", "گسسته", "فیزیک", "هندسه"],
@@ -31,6 +31,11 @@ class Course(models.Model):
         verbose_name="اطلاع‌رسانی پرداخت ارسال شده؟",
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_active', 'advisor'], name='plans_course_active_adv_idx'),
+        ]
+
     def __str__(self):
         return f"دوره {self.student} با {self.advisor} - {self.get_day_of_week_display()} ها"
 
@@ -63,6 +68,9 @@ class Session(models.Model):
 
     class Meta:
         unique_together = ('course', 'session_number')
+        indexes = [
+            models.Index(fields=['is_completed', 'date', 'course'], name='plans_session_done_date_idx'),
+        ]
 
     def __str__(self):
         return f"جلسه {self.session_number} از دوره {self.course.id}"
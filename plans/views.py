@@ -25,7 +25,6 @@ from management.utils import send_sms_message, send_telegram_message
 
 DAY_LABELS = {code: label for code, label in Course.DAY_CHOICES}
 DAY_FA_TO_EN = {label: code for code, label in Course.DAY_CHOICES}
-DAY_ORDER = {code: index for index, (code, _label) in enumerate(Course.DAY_CHOICES)}
 PY_WEEKDAY_MAP = {
     'Monday': 0,
     'Tuesday': 1,
@@ -83,15 +82,16 @@ def serialize_advisors_with_schedule(advisors):
         availabilities = getattr(advisor, 'availabilities', [])
         sorted_slots = sorted(
             availabilities.all() if hasattr(availabilities, 'all') else availabilities,
-            key=lambda slot: (DAY_ORDER.get(slot.day_of_week, 0), slot.start_time),
+            key=lambda slot: (slot.day_of_week, slot.start_time),
         )
         for slot in sorted_slots:
-            assigned_count = counts_map.get((advisor.id, slot.day_of_week, slot.start_time), 0)
+            day_code = slot.day_code
+            assigned_count = counts_map.get((advisor.id, day_code, slot.start_time), 0)
             remaining_capacity = max(slot.max_students - assigned_count, 0)
             working_hours.append({
                 'id': slot.id,
-                'day_of_week': slot.day_of_week,
-                'day_label': DAY_LABELS.get(slot.day_of_week, slot.day_of_week),
+                'day_of_week': day_code,
+                'day_label': DAY_LABELS.get(day_code, day_code),
                 'start_time': slot.start_time.strftime('%H:%M'),
                 'end_time': slot.end_time.strftime('%H:%M'),
                 'max_students': slot.max_students,
@@ -136,7 +136,7 @@ def create_advisor_availability_slot(advisor, payload):
 
     availability = AdvisorAvailability.objects.create(
         advisor=advisor,
-        day_of_week=day_code,
+        day_of_week=WEEKDAY_BY_CODE[day_code],
         start_time=start_time,
         end_time=end_time,
         max_students=max_students,
@@ -388,8 +388,8 @@ def admin_advisor_add_availability(request, advisor_id):
         'status': 'success',
         'availability': {
             'id': availability.id,
-            'day_of_week': availability.day_of_week,
-            'day_label': DAY_LABELS.get(availability.day_of_week, availability.day_of_week),
+            'day_of_week': availability.day_code,
+            'day_label': DAY_LABELS.get(availability.day_code, availability.day_code),
             'start_time': availability.start_time.strftime('%H:%M'),
             'end_time': availability.end_time.strftime('%H:%M'),
             'max_students': availability.max_students,
@@ -412,7 +412,7 @@ def admin_advisor_delete_availability(request, availability_id):
 
     active_assignments = Course.objects.filter(
         advisor=availability.advisor,
-        day_of_week=availability.day_of_week,
+        day_of_week=availability.day_code,
         start_time=availability.start_time,
         is_active=True,
     ).count()
@@ -452,7 +452,7 @@ def assign_student_view(request):
 
         availability = AdvisorAvailability.objects.filter(
             advisor=advisor,
-            day_of_week=day_of_week,
+            day_of_week=WEEKDAY_BY_CODE.get(day_of_week),
             start_time=start_time,
         ).first()
 
@@ -646,7 +646,7 @@ class CourseViewSet(viewsets.ModelViewSet):
 
             availability = AdvisorAvailability.objects.filter(
                 advisor=instance.advisor,
-                day_of_week=normalized_day,
+                day_of_week=WEEKDAY_BY_CODE[normalized_day],
                 start_time=parsed_start_time,
             ).first()
 